@@ -0,0 +1,93 @@
+"""Concurrent login throughput: blocking pymongo driver vs asyncio motor driver.
+
+Run from the project root, with ``app_configs.yaml`` and a reachable MongoDB:
+
+    python benchmarks/bench_async_endpoints.py --concurrency 200 --requests 4000
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from auth_api.app import api
+from auth_api.databases.mongo import AsyncMongoHandler, MongoHandler
+
+BENCH_APP = "bench-app"
+BENCH_USER = {
+    "app_name": BENCH_APP,
+    "user_id": 900001,
+    "user_name": "bench-user",
+    "password": "bench-password",
+    "role": "user",
+}
+
+
+async def hammer(client: httpx.AsyncClient, total: int, concurrency: int) -> float:
+    """Fire `total` login requests, `concurrency` at a time, and return requests/s."""
+    semaphore = asyncio.Semaphore(concurrency)
+    body = {key: BENCH_USER[key] for key in ("app_name", "user_name", "password")}
+
+    async def one_request():
+        async with semaphore:
+            response = await client.post("/auth-api/v1/login", json=body)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+async def signup(client: httpx.AsyncClient) -> None:
+    response = await client.post("/auth-api/v1/signup", json=BENCH_USER)
+    response.raise_for_status()
+
+
+async def run_scenario(configs: dict, handler, total: int, concurrency: int) -> float:
+    """Serve the API on top of `handler` and measure login requests/s."""
+    app = api.create_app(configs, handler)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=60
+    ) as client:
+        await api.run_db(
+            handler.delete_document, BENCH_APP, {"user_name": BENCH_USER["user_name"]}
+        )
+        await signup(client)
+        rps = await hammer(client, total, concurrency)
+        await api.run_db(
+            handler.delete_document, BENCH_APP, {"user_name": BENCH_USER["user_name"]}
+        )
+    return rps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    args = parser.parse_args()
+
+    configs = api.load_configs()
+    db_configs = dict(configs["AUTH_DB"])
+    db_configs.pop("async_driver", None)
+
+    results = {}
+    for label, handler_cls in (
+        ("pymongo (threadpool)", MongoHandler),
+        ("motor (asyncio)", AsyncMongoHandler),
+    ):
+        # motor binds to the running loop, so build each handler inside its own run
+        async def scenario():
+            handler = handler_cls(**db_configs)
+            return await run_scenario(configs, handler, args.requests, args.concurrency)
+
+        results[label] = asyncio.run(scenario())
+        print(f"{label:<22} {results[label]:>10.1f} req/s")
+
+    baseline, candidate = results.values()
+    print(f"{'speed-up':<22} {candidate / baseline:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Login throughput of the served API: single process vs workers, loop and parser.
+
+Starts the API over real sockets with the same uvicorn options `serve` uses,
+once per mode, and drives logins of a seeded user at it for a fixed time:
+
+    python benchmarks/bench_server.py --workers 4 --duration 15
+
+Each worker gets its own InMemoryMongoHandler seeded with the bench user, so
+no MongoDB is needed. The load generator runs on the same host, so on a
+machine with few cores it competes with the workers; compare modes on the
+same machine only.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess  # nosec B404
+import sys
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_USER = {
+    "app_name": "bench-app",
+    "user_id": 1,
+    "user_name": "bench-user",
+    "password": "bench-password",
+    "role": "user",
+}
+
+
+def create_bench_app():
+    """App factory run by every worker: the API over a seeded in-memory store."""
+    import pytz
+    from inmemory_mongo import InMemoryMongoHandler
+    from run_benchmarks import bench_configs
+
+    from auth_api.app import api
+    from auth_api.app.authentication import Authenticator
+    from auth_api.app.models import AuthConfig, RegisterPayload
+
+    configs = bench_configs(int(os.environ["BENCH_BCRYPT_ROUNDS"]))
+    authenticator = Authenticator(AuthConfig(**configs["AUTH_CONFIG"]))
+    expire = datetime.now(tz=pytz.utc) + timedelta(hours=1)
+    hashed_password = authenticator.hash_password(BENCH_USER["password"])
+    payload = RegisterPayload(**BENCH_USER, expire=expire.strftime("%Y-%m-%d %H:%M:%S"))
+    handler = InMemoryMongoHandler()
+    handler.create(
+        BENCH_USER["app_name"],
+        {
+            **BENCH_USER,
+            "password": hashed_password,
+            "token": authenticator.create_jwt_token(payload, hashed_password, expire),
+        },
+    )
+    return api.create_app(configs, handler)
+
+
+def run_server(port: int, workers: int, loop: str, http: str) -> None:
+    import uvicorn
+
+    from auth_api.app.models import ServerConfig
+    from auth_api.app.server import uvicorn_options
+
+    server_config = ServerConfig(
+        HOST="127.0.0.1",
+        PORT=port,
+        LOG_LEVEL="warning",
+        WORKERS=workers,
+        LOOP=loop,
+        HTTP=http,
+    )
+    uvicorn.run(
+        "bench_server:create_bench_app",
+        factory=True,
+        **uvicorn_options(server_config),
+    )
+
+
+async def drive(base_url: str, duration: float, concurrency: int) -> dict:
+    body = {key: BENCH_USER[key] for key in ("app_name", "user_name", "password")}
+    samples = []
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=5) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.post("/auth-api/v1/login", json=body)
+                samples.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise RuntimeError(f"login answered {response.status_code}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    samples.sort()
+    return {
+        "requests": len(samples),
+        "requests_per_second": round(len(samples) / elapsed, 1),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 2),
+        "p99_ms": round(samples[int(len(samples) * 0.99)] * 1000, 2),
+    }
+
+
+def wait_ready(base_url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{base_url}/metrics", timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on {base_url} did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--bcrypt-rounds", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8095)
+    parser.add_argument("--serve", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        workers, loop, http = args.serve
+        run_server(args.port, int(workers), loop, http)
+        return
+
+    modes = [
+        ("1 process, asyncio + h11", 1, "asyncio", "h11"),
+        ("1 process, uvloop + httptools", 1, "uvloop", "httptools"),
+        (
+            f"{args.workers} workers, uvloop + httptools",
+            args.workers,
+            "uvloop",
+            "httptools",
+        ),
+    ]
+    env = dict(os.environ)
+    env["BENCH_BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [BENCH_DIR, os.path.join(BENCH_DIR, "..", "src"), env.get("PYTHONPATH", "")]
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    results = {}
+    for label, workers, loop, http in modes:
+        # the only subprocess use (hence the nosec on its import): argv is
+        # this interpreter and script with fixed options
+        server = subprocess.Popen(  # nosec B603
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--port",
+                str(args.port),
+                "--serve",
+                str(workers),
+                loop,
+                http,
+            ],
+            env=env,
+        )
+        try:
+            wait_ready(base_url)
+            # let every worker finish starting before measuring
+            asyncio.run(drive(base_url, args.warmup, args.concurrency))
+            results[label] = asyncio.run(
+                drive(base_url, args.duration, args.concurrency)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"{label:<36} {results[label]}", file=sys.stderr)
+
+    meta = {
+        "cpu_count": os.cpu_count(),
+        "duration": args.duration,
+        "concurrency": args.concurrency,
+        "bcrypt_rounds": args.bcrypt_rounds,
+    }
+    print(json.dumps({"meta": meta, "login": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
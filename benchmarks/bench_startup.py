@@ -0,0 +1,111 @@
+"""Cold start: time from a fresh interpreter to the first API response.
+
+Every run starts a new Python process that imports the API, builds it with
+create_app, runs the lifespan startup and answers one login (an unknown user,
+so one database lookup and no password hashing). The data layer is
+InMemoryMongoHandler, so no MongoDB is needed:
+
+    python benchmarks/bench_startup.py --runs 20
+
+Phases are reported in ms as median and p95 over the runs, next to the wall
+time of the whole process (interpreter start and shutdown included).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess  # nosec B404
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def child() -> None:
+    start = time.perf_counter()
+    from auth_api.app import api
+
+    imported = time.perf_counter()
+
+    import asyncio
+    import logging
+
+    import httpx
+    from inmemory_mongo import InMemoryMongoHandler
+    from run_benchmarks import bench_configs
+
+    logging.disable(logging.CRITICAL)
+    created = time.perf_counter()
+    app = api.create_app(bench_configs(bcrypt_rounds=4), InMemoryMongoHandler())
+    timings = {
+        "import_ms": imported - start,
+        "create_app_ms": time.perf_counter() - created,
+    }
+
+    async def first_response() -> None:
+        lifespan_start = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            timings["lifespan_ms"] = time.perf_counter() - lifespan_start
+            request_start = time.perf_counter()
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app),
+                base_url="http://bench",
+                timeout=60,
+            ) as client:
+                await client.post(
+                    "/auth-api/v1/login",
+                    json={"app_name": "bench-app", "user_name": "x", "password": "x"},
+                )
+            timings["first_request_ms"] = time.perf_counter() - request_start
+            timings["import_to_first_response_ms"] = time.perf_counter() - start
+
+    asyncio.run(first_response())
+    print(json.dumps({name: value * 1000 for name, value in timings.items()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [BENCH_DIR, os.path.join(BENCH_DIR, "..", "src"), env.get("PYTHONPATH", "")]
+    )
+    samples = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        # the only subprocess use (hence the nosec on its import): argv is
+        # this interpreter and script with fixed options
+        output = subprocess.run(  # nosec B603
+            [sys.executable, os.path.abspath(__file__), "--child"],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        run = json.loads(output.strip().splitlines()[-1])
+        run["process_wall_ms"] = (time.perf_counter() - start) * 1000
+        samples.append(run)
+
+    results = {}
+    for name in samples[0]:
+        values = sorted(sample[name] for sample in samples)
+        results[name] = {
+            "median": round(statistics.median(values), 2),
+            "p95": round(
+                values[min(len(values) - 1, round(0.95 * (len(values) - 1)))], 2
+            ),
+        }
+    print(json.dumps({"runs": args.runs, "startup": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""In-memory stand-in for MongoHandler, used to benchmark the API without a server.
+
+It honours the unique user indexes (user_name, user_id) the real collections
+carry and counts every call, so benchmarks can report database round trips per
+request next to latencies.
+"""
+
+import threading
+from collections import Counter, defaultdict
+from copy import deepcopy
+from typing import List, Optional
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from auth_api.databases.mongo import DUPLICATE_KEY, USER_INDEXES
+from auth_api.databases.registry import CollectionRegistry
+
+UNIQUE_FIELDS = [next(iter(index.document["key"])) for index in USER_INDEXES]
+
+
+class InMemoryMongoHandler:
+    """Thread-safe dict-backed implementation of the MongoHandler interface."""
+
+    def __init__(self):
+        self.collections = CollectionRegistry()
+        self.round_trips = Counter()
+        self._documents = defaultdict(list)
+        # user_name -> document, stands in for the user_name_unique index
+        self._by_user_name = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _matches(document: dict, filter_query: dict) -> bool:
+        return all(document.get(key) == value for key, value in filter_query.items())
+
+    def _find(self, collection_name: str, filter_query: dict) -> Optional[dict]:
+        if "user_name" in filter_query:
+            document = self._by_user_name[collection_name].get(
+                filter_query["user_name"]
+            )
+            if document is not None and self._matches(document, filter_query):
+                return document
+            return None
+        for document in self._documents[collection_name]:
+            if self._matches(document, filter_query):
+                return document
+        return None
+
+    def _check_unique(self, collection_name: str, document: dict) -> None:
+        for field in UNIQUE_FIELDS:
+            if field in document and self._find(
+                collection_name, {field: document[field]}
+            ):
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {collection_name}",
+                    DUPLICATE_KEY,
+                    {
+                        "code": DUPLICATE_KEY,
+                        "keyPattern": {field: 1},
+                        "keyValue": {field: document[field]},
+                    },
+                )
+
+    def _insert(self, collection_name: str, document: dict) -> ObjectId:
+        self._check_unique(collection_name, document)
+        document.setdefault("_id", ObjectId())
+        stored = deepcopy(document)
+        self._documents[collection_name].append(stored)
+        if "user_name" in stored:
+            self._by_user_name[collection_name][stored["user_name"]] = stored
+        return document["_id"]
+
+    def ping(self) -> None:
+        self.round_trips["ping"] += 1
+
+    def get_document(
+        self,
+        collection_name: str,
+        filter_query: dict,
+        projection: Optional[dict] = None,
+    ) -> Optional[dict]:
+        with self._lock:
+            self.round_trips["find_one"] += 1
+            document = self._find(collection_name, filter_query)
+            if document is not None and projection:
+                # inclusion projections only, which is all the API sends
+                fields = [field for field, keep in projection.items() if keep]
+                if projection.get("_id", 1):
+                    fields.append("_id")
+                document = {
+                    field: document[field] for field in fields if field in document
+                }
+            return deepcopy(document)
+
+    def create(self, collection_name: str, document) -> str:
+        with self._lock:
+            self.round_trips["insert_one"] += 1
+            return self._insert(collection_name, document)
+
+    def create_token(self, collection_name: str, document: dict) -> None:
+        with self._lock:
+            self.round_trips["insert_token"] += 1
+            self._insert(collection_name, document)
+
+    def create_many(self, collection_name: str, documents: list) -> List[dict]:
+        with self._lock:
+            self.round_trips["insert_many"] += 1
+            write_errors = []
+            for index, document in enumerate(documents):
+                try:
+                    self._insert(collection_name, document)
+                except DuplicateKeyError as err:
+                    write_errors.append({"index": index, **err.details})
+            # MongoHandler.create_many returns BulkWriteError's writeErrors as is
+            return write_errors
+
+    def upsert(
+        self, collection_name: str, filter_query: dict, update_data: dict
+    ) -> str:
+        with self._lock:
+            self.round_trips["update_one"] += 1
+            document = self._find(collection_name, filter_query)
+            if document is None:
+                return self._insert(collection_name, {**filter_query, **update_data})
+            self._by_user_name[collection_name].pop(document.get("user_name"), None)
+            document.update(deepcopy(update_data))
+            if "user_name" in document:
+                self._by_user_name[collection_name][document["user_name"]] = document
+            return "Updated"
+
+    def bulk_update(self, collection_name: str, updates: List[tuple]) -> int:
+        # the $inc / $max updates the login event recorder sends
+        with self._lock:
+            self.round_trips["bulk_write"] += 1
+            matched = 0
+            for filter_query, update in updates:
+                document = self._find(collection_name, filter_query)
+                if document is None:
+                    continue
+                matched += 1
+                for field, value in update.get("$inc", {}).items():
+                    document[field] = document.get(field, 0) + value
+                for field, value in update.get("$max", {}).items():
+                    if document.get(field) is None or document[field] < value:
+                        document[field] = value
+            return matched
+
+    def delete_document(self, collection_name: str, filter_query) -> None:
+        with self._lock:
+            self.round_trips["delete_one"] += 1
+            document = self._find(collection_name, filter_query)
+            if document is not None:
+                self._documents[collection_name].remove(document)
+                self._by_user_name[collection_name].pop(document.get("user_name"), None)
+
+    def delete_documents(self, collection_name: str, filter_query: dict) -> int:
+        with self._lock:
+            self.round_trips["delete_many"] += 1
+            documents = [
+                document
+                for document in self._documents[collection_name]
+                if self._matches(document, filter_query)
+            ]
+            for document in documents:
+                self._documents[collection_name].remove(document)
+                self._by_user_name[collection_name].pop(document.get("user_name"), None)
+            return len(documents)
+
+    def pop_document(self, collection_name: str, filter_query: dict) -> Optional[dict]:
+        with self._lock:
+            self.round_trips["find_one_and_delete"] += 1
+            document = self._find(collection_name, filter_query)
+            if document is not None:
+                self._documents[collection_name].remove(document)
+                self._by_user_name[collection_name].pop(document.get("user_name"), None)
+            return document
+
+    def create_collection_if_not_exist(self, collection_name: str) -> None:
+        if self.collections.lookup(collection_name):
+            return
+        with self._lock:
+            self.round_trips["create_collection"] += 1
+            self._documents.setdefault(collection_name, [])
+            self.collections.add(collection_name)
+
+    def ensure_indexes(self, collection_name: str) -> None:
+        with self._lock:
+            self.round_trips["create_indexes"] += 1
+
+    def warm_collections(self) -> None:
+        with self._lock:
+            self.round_trips["list_collection_names"] += 1
+            self.collections.load(self._documents)
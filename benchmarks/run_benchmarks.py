@@ -0,0 +1,385 @@
+"""Reproducible latency/throughput benchmarks for the auth API.
+
+Drives the FastAPI app in-process against InMemoryMongoHandler, so no MongoDB
+is needed, and micro-benchmarks the Authenticator hot spots. Results are JSON
+(p50/p95/p99 latencies in ms, operations per second and, for endpoints,
+database round trips per request) so two commits can be compared:
+
+    python benchmarks/run_benchmarks.py --output baseline.json
+    git checkout my-branch
+    python benchmarks/run_benchmarks.py --compare baseline.json
+
+With --compare the process exits with status 1 when any benchmark regressed
+beyond --threshold.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from inmemory_mongo import InMemoryMongoHandler  # noqa: E402
+
+BENCH_APP = "bench-app"
+
+
+def bench_configs(bcrypt_rounds: int) -> dict:
+    """Fixed configuration, so runs on different commits stay comparable."""
+    return {
+        "APP_NAME": "AUTH-API-BENCH",
+        "TIME_ZONE": "UTC",
+        "TIME_DELTA": "0:1:0:0",
+        "AUTH_CONFIG": {
+            "secret_key": "bench-secret",
+            "expire_delta": 60,
+            "algorithm": "HS256",
+            "encrypt_key": "bench-encrypt-key",
+            "password_hasher": "bcrypt",
+            "hasher_params": {"rounds": bcrypt_rounds},
+            "token_cache_size": 10000,
+        },
+        "AUTH_DB": {
+            "connection_string": "mongodb://localhost:27017/",
+            "database_name": "auth-api-bench",
+        },
+        "CPU_EXECUTOR": {"kind": "thread", "max_queue": 100000},
+        "LOGGING_CONFIG": {"version": 1},
+        "API_CONFIGS": {"HOST": "127.0.0.1", "PORT": 8090, "LOG_LEVEL": "warning"},
+    }
+
+
+def load_api(bcrypt_rounds: int):
+    """Build the API for the bench config on top of an in-memory data layer."""
+    import logging
+
+    from auth_api.app import api
+
+    app = api.create_app(bench_configs(bcrypt_rounds), InMemoryMongoHandler())
+    logging.disable(logging.CRITICAL)
+    return api, app
+
+
+def summarize(samples: List[float], elapsed: float) -> Dict[str, float]:
+    """Latency percentiles (ms) and throughput for a list of durations (s)."""
+    ordered = sorted(samples)
+
+    def percentile(rank: float) -> float:
+        index = min(len(ordered) - 1, round(rank / 100 * (len(ordered) - 1)))
+        return round(ordered[index] * 1000, 4)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 4),
+        "ops_per_second": round(len(ordered) / elapsed, 2),
+    }
+
+
+def micro_benchmark(func: Callable, iterations: int) -> Dict[str, float]:
+    samples = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - call_start)
+    return summarize(samples, time.perf_counter() - start)
+
+
+def run_micro_benchmarks(api, iterations: int) -> Dict[str, dict]:
+    from fastapi.responses import JSONResponse as StarletteJSONResponse
+
+    from auth_api.app.models import LoginRequest, RegisterPayload
+    from auth_api.app.responses import JSONResponse
+    from auth_api.databases.login_events import LoginEventRecorder
+    from auth_api.utils.tools import delta_parse
+
+    authenticator = api.authenticator
+    now = datetime.now(tz=api.TIME_ZONE)
+    payload = RegisterPayload(
+        app_name=BENCH_APP,
+        user_id=1,
+        user_name="micro-user",
+        password="micro-password",  # nosec B106
+        role="user",
+        expire=(now + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S"),
+    )
+    hashed_password = authenticator.hash_password(payload.password)
+    token = authenticator.create_jwt_token(payload, hashed_password)
+    token_cache = authenticator.token_cache
+    token_body = {
+        "status": "SUCCESS",
+        "token_type": "Bearer",
+        "access_token": token,
+        "expires_in": 900,
+        "refresh_token": "r" * 43,
+        "refresh_expires_in": 1209600,
+    }
+    login_body = json.dumps(
+        {"app_name": BENCH_APP, "user_name": "micro-user", "password": "micro-password"}
+    ).encode("utf-8")
+
+    async def discard(app_name, updates):
+        pass
+
+    login_events = LoginEventRecorder(discard)
+
+    def validate_uncached():
+        authenticator.token_cache = None
+        try:
+            authenticator.validate_jwt_token(token, now, api.TIME_ZONE)
+        finally:
+            authenticator.token_cache = token_cache
+
+    # bcrypt is slow by design, so it gets far fewer iterations
+    hash_iterations = max(5, iterations // 100)
+    return {
+        "hash_password": micro_benchmark(
+            lambda: authenticator.hash_password(payload.password), hash_iterations
+        ),
+        "create_jwt_token": micro_benchmark(
+            lambda: authenticator.create_jwt_token(payload, hashed_password),
+            iterations,
+        ),
+        "validate_jwt_token": micro_benchmark(validate_uncached, iterations),
+        "validate_jwt_token_cached": micro_benchmark(
+            lambda: authenticator.validate_jwt_token(token, now, api.TIME_ZONE),
+            iterations,
+        ),
+        "delta_parse": micro_benchmark(lambda: delta_parse("1:2:3:4"), iterations),
+        # per-request response and body handling, stock vs fast path
+        "response_json_stdlib": micro_benchmark(
+            lambda: StarletteJSONResponse(token_body), iterations
+        ),
+        "response_json_orjson": micro_benchmark(
+            lambda: JSONResponse(token_body), iterations
+        ),
+        "response_fixed": micro_benchmark(api.AUTH_SUCCESS, iterations),
+        "decode_login_model": micro_benchmark(
+            lambda: LoginRequest.model_validate(json.loads(login_body)), iterations
+        ),
+        "decode_login_fast": micro_benchmark(
+            lambda: api.decode_login(login_body), iterations
+        ),
+        # what LOGIN_EVENTS adds to a login; the bulk write runs off the request
+        "login_event_record": micro_benchmark(
+            lambda: login_events.record(BENCH_APP, "micro-user", True), iterations
+        ),
+    }
+
+
+async def endpoint_benchmark(
+    api,
+    client,
+    make_request: Callable[[int], tuple],
+    total: int,
+    concurrency: int,
+    on_response: Optional[Callable[[int, dict], None]] = None,
+) -> Dict[str, float]:
+    """Closed loop: `concurrency` workers send `total` requests between them."""
+    samples = []
+    counter = iter(range(total))
+    round_trips_before = sum(api.mongo.round_trips.values())
+
+    async def worker():
+        for request_number in counter:
+            path, body = make_request(request_number)
+            call_start = time.perf_counter()
+            response = await client.post(path, json=body)
+            samples.append(time.perf_counter() - call_start)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{path} answered {response.status_code}")
+            if on_response is not None:
+                on_response(request_number, response.json())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(samples, time.perf_counter() - start)
+    round_trips = sum(api.mongo.round_trips.values()) - round_trips_before
+    result["db_round_trips_per_request"] = round(round_trips / total, 3)
+    return result
+
+
+async def run_endpoint_benchmarks(
+    api, app, total: int, concurrency: int
+) -> Dict[str, dict]:
+    def user(number: int) -> dict:
+        return {
+            "app_name": BENCH_APP,
+            "user_id": number,
+            "user_name": f"bench-user-{number}",
+            "password": "bench-password",
+            "role": "user",
+        }
+
+    # every renew must present the password set by the previous one
+    passwords = {}
+
+    def renew(number: int) -> tuple:
+        user_number = number % total
+        old_password = passwords.get(user_number, "bench-password")
+        passwords[user_number] = f"bench-password-{number}"
+        return "/auth-api/v1/renew-credentials", {
+            "app_name": BENCH_APP,
+            "user_name": f"bench-user-{user_number}",
+            "old_password": old_password,
+            "new_password": passwords[user_number],
+        }
+
+    transport = httpx.ASGITransport(app=app)
+    # the in-process transport does not enforce client timeouts
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=60
+    ) as client:
+        results = {
+            "signup": await endpoint_benchmark(
+                api,
+                client,
+                lambda n: ("/auth-api/v1/signup", user(n)),
+                total,
+                concurrency,
+            ),
+        }
+        results["login"] = await endpoint_benchmark(
+            api,
+            client,
+            lambda n: (
+                "/auth-api/v1/login",
+                {
+                    "app_name": BENCH_APP,
+                    "user_name": f"bench-user-{n % total}",
+                    "password": "bench-password",
+                },
+            ),
+            total,
+            concurrency,
+        )
+        results["renew_credentials"] = await endpoint_benchmark(
+            api, client, renew, total, concurrency
+        )
+        # password grant once per user, then refresh token rotations only
+        refresh_tokens = {}
+
+        def keep_refresh_token(number: int, body: dict) -> None:
+            refresh_tokens[number % total] = body["refresh_token"]
+
+        results["token"] = await endpoint_benchmark(
+            api,
+            client,
+            lambda n: (
+                "/auth-api/v1/token",
+                {
+                    "app_name": BENCH_APP,
+                    "user_name": f"bench-user-{n % total}",
+                    "password": passwords.get(n % total, "bench-password"),
+                },
+            ),
+            total,
+            concurrency,
+            keep_refresh_token,
+        )
+        results["token_refresh"] = await endpoint_benchmark(
+            api,
+            client,
+            lambda n: (
+                "/auth-api/v1/token/refresh",
+                {"app_name": BENCH_APP, "refresh_token": refresh_tokens[n % total]},
+            ),
+            total,
+            concurrency,
+            keep_refresh_token,
+        )
+    return results
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> List[str]:
+    """List the benchmarks slower, or chattier with the database, than baseline."""
+    regressions = []
+    for group in ("micro", "endpoints"):
+        for name, base in baseline.get(group, {}).items():
+            current = candidate.get(group, {}).get(name)
+            if current is None:
+                continue
+            if current["p95_ms"] > base["p95_ms"] * (1 + threshold):
+                regressions.append(
+                    f"{group}.{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms"
+                )
+            if current["ops_per_second"] < base["ops_per_second"] * (1 - threshold):
+                regressions.append(
+                    f"{group}.{name}: {base['ops_per_second']} -> "
+                    f"{current['ops_per_second']} ops/s"
+                )
+            base_trips = base.get("db_round_trips_per_request")
+            if base_trips is not None:
+                if current["db_round_trips_per_request"] > base_trips:
+                    regressions.append(
+                        f"{group}.{name}: db round trips {base_trips} -> "
+                        f"{current['db_round_trips_per_request']} per request"
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    api, app = load_api(args.bcrypt_rounds)
+
+    async def run_benchmarks() -> tuple:
+        # the lifespan opens the executor and authenticator, then releases them
+        async with app.router.lifespan_context(app):
+            micro = run_micro_benchmarks(api, args.iterations)
+            endpoints = await run_endpoint_benchmarks(
+                api, app, args.requests, args.concurrency
+            )
+        return micro, endpoints
+
+    micro, endpoints = asyncio.run(run_benchmarks())
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "bcrypt_rounds": args.bcrypt_rounds,
+        },
+        "micro": micro,
+        "endpoints": endpoints,
+    }
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(json.load(file), results, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,64 +1,547 @@
+import asyncio
+import hashlib
+import inspect
+import json
 import logging
+import math
+import os
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
 from datetime import timedelta
+from typing import Optional
 
+import orjson
 import pytz
-import uvicorn
-from fastapi import FastAPI, status
+from fastapi import APIRouter, Depends, FastAPI, Request, Response, status
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from pydantic import ValidationError
+from pymongo.errors import DuplicateKeyError
+from starlette.concurrency import run_in_threadpool
 
 from auth_api.app.authentication import Authenticator
+from auth_api.app.middleware import (
+    LabelledRoute,
+    RequestLoggingMiddleware,
+    RequestMetricsMiddleware,
+)
 from auth_api.app.models import *
-from auth_api.databases.mongo import MongoHandler
+from auth_api.app.responses import FixedResponse, JSONResponse
+from auth_api.databases.login_events import LoginEventRecorder
+from auth_api.databases.mongo import (
+    DUPLICATE_KEY,
+    AsyncMongoHandler,
+    MissingUniqueIndexError,
+    MongoHandler,
+    duplicated_key,
+)
+from auth_api.databases.records import UserRecord
+from auth_api.databases.user_cache import UserRecordCache
+from auth_api.utils.executors import BoundedExecutor, ExecutorSaturatedError
+from auth_api.utils.logs import setup_logging
+from auth_api.utils.metrics import metrics
+from auth_api.utils.ratelimit import TokenBucketLimiter
+from auth_api.utils.singleflight import SingleFlight
 from auth_api.utils.tools import delta_parse, read_yaml
 
-# Instance vars and objects globally used
-APP_CONFIGS = read_yaml("app_configs.yaml")
-APP_NAME = APP_CONFIGS["APP_NAME"]
-TIME_ZONE = pytz.timezone(APP_CONFIGS["TIME_ZONE"])
-mongo = MongoHandler(**APP_CONFIGS["AUTH_DB"])
-auth_config = AuthConfig(**APP_CONFIGS["AUTH_CONFIG"])
-authenticator = Authenticator(auth_config)
+# Instance vars and objects globally used. create_app sets the configuration
+# and the lifespan handler opens the resources (database client, CPU executor,
+# authenticator), so they are created in each worker after a pre-fork server
+# forks, never at import time.
+APP_CONFIGS: dict = {}
+APP_NAME = None
+TIME_ZONE = None
+auth_config: Optional[AuthConfig] = None
+bulk_signup_config = BulkSignupConfig()
+verify_batch_config = VerifyBatchConfig()
+logging_config = AppLoggingConfig()
+login_events_config = LoginEventsConfig()
+user_cache: Optional[UserRecordCache] = None
+login_flights: Optional[SingleFlight] = None
+ip_limiter: Optional[TokenBucketLimiter] = None
+user_limiter: Optional[TokenBucketLimiter] = None
+mongo = None
+cpu_executor: Optional[BoundedExecutor] = None
+authenticator: Optional[Authenticator] = None
+jwks_document = None
+log_listener = None
+login_events: Optional[LoginEventRecorder] = None
 
-# Logging setup
+router = APIRouter()
+bearer_scheme = HTTPBearer(auto_error=False)
+# a readiness probe must answer well within the orchestrator's probe timeout
+READY_PING_TIMEOUT = 2  # seconds
 
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
+# Fixed responses, encoded once
+SIGNUP_SUCCESS = FixedResponse({"status": "SUCCESS"})
+USER_NOT_EXIST = FixedResponse(
+    {
+        "status": "USER_NOT_EXIST",
+        "message": "User does not exist  or password is incorret! Try to signup.",
+    },
+    status.HTTP_403_FORBIDDEN,
+)
+AUTH_SUCCESS = FixedResponse({"status": "AUTH_SUCCESS"})
+LOGIN_RESPONSES = {
+    "USER_NOT_EXIST": USER_NOT_EXIST,
+    "WRONG_PASSWORD": USER_NOT_EXIST,
+    "VALID_TOKEN": AUTH_SUCCESS,
+    "TOKEN_EXPIRED": FixedResponse(
+        {
+            "status": "AUTH_FAILED",
+            "message": "Token has expired, please renew your credentials",
+        },
+        status.HTTP_403_FORBIDDEN,
+    ),
+    "INVALID_TOKEN": FixedResponse(
+        {
+            "status": "AUTH_FAILED",
+            "message": "Token is invalid, enter in contact with your administrator",
+        },
+        status.HTTP_403_FORBIDDEN,
+    ),
+}
+LOGIN_FAILED = FixedResponse(
+    {
+        "status": "ERROR",
+        "message": "Login failed, please contact your administrator.",
+    },
+    status.HTTP_500_INTERNAL_SERVER_ERROR,
+)
+WRONG_OLD_PASSWORD = FixedResponse(
+    {
+        "status": "ERROR",
+        "message": "The password offered doesn't matched with current password or user does not exist.",
+    },
+    status.HTTP_403_FORBIDDEN,
+)
+PASSWORD_REUSED = FixedResponse(
+    {"status": "ERROR", "message": "Not allowed using previous password"},
+    status.HTTP_403_FORBIDDEN,
+)
+RENEW_FAILED = FixedResponse(
+    {
+        "status": "ERROR",
+        "message": "Failed to renew user credentials, please contact your administrator.",
+    },
+    status.HTTP_500_INTERNAL_SERVER_ERROR,
+)
+TOKEN_FAILED = FixedResponse(
+    {
+        "status": "ERROR",
+        "message": "Failed to issue tokens, please contact your administrator.",
+    },
+    status.HTTP_500_INTERNAL_SERVER_ERROR,
+)
+INVALID_REFRESH_TOKEN = FixedResponse(
+    {
+        "status": "INVALID_REFRESH_TOKEN",
+        "message": "Refresh token is invalid or was already used, please login again.",
+    },
+    status.HTTP_401_UNAUTHORIZED,
+)
+REFRESH_TOKEN_EXPIRED = FixedResponse(
+    {
+        "status": "REFRESH_TOKEN_EXPIRED",
+        "message": "Refresh token has expired, please login again.",
+    },
+    status.HTTP_401_UNAUTHORIZED,
+)
+REFRESH_FAILED = FixedResponse(
+    {
+        "status": "ERROR",
+        "message": "Failed to refresh tokens, please contact your administrator.",
+    },
+    status.HTTP_500_INTERNAL_SERVER_ERROR,
+)
+VERIFY_TOKEN_EXPIRED = FixedResponse(
+    {
+        "status": "TOKEN_EXPIRED",
+        "message": "Token has expired, please renew your credentials",
+    },
+    status.HTTP_401_UNAUTHORIZED,
+    {"WWW-Authenticate": "Bearer"},
+)
+VERIFY_INVALID_TOKEN = FixedResponse(
+    {
+        "status": "INVALID_TOKEN",
+        "message": "Token is invalid, enter in contact with your administrator",
+    },
+    status.HTTP_401_UNAUTHORIZED,
+    {"WWW-Authenticate": "Bearer"},
+)
+NO_PUBLIC_KEYS = FixedResponse(
+    {
+        "status": "FAILED",
+        "message": "Tokens are signed with a shared secret, there are no public keys.",
+    },
+    status.HTTP_404_NOT_FOUND,
+)
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format=f"%(asctime)s - [{APP_NAME}] - %(levelname)s:  %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[logging.StreamHandler()],
-)
+def load_configs() -> dict:
+    """Read the file named by AUTH_API_CONFIG, app_configs.yaml by default."""
+    return read_yaml(os.getenv("AUTH_API_CONFIG", "app_configs.yaml"))
 
 
-# set app
-app = FastAPI()
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def open_mongo(db_configs: dict):
+    db_configs = dict(db_configs)
+    if db_configs.pop("async_driver", False):
+        return AsyncMongoHandler(**db_configs)
+    return MongoHandler(**db_configs)
+
+
+def register_gauges() -> None:
+    if authenticator.token_cache is not None:
+        metrics.register_gauge(
+            "auth_api_token_cache",
+            "Verified token cache counters.",
+            "stat",
+            authenticator.token_cache.stats,
+        )
+    if user_cache is not None:
+        metrics.register_gauge(
+            "auth_api_user_cache",
+            "User record cache counters and hit ratio.",
+            "stat",
+            user_cache.stats,
+        )
+    if login_flights is not None:
+        metrics.register_gauge(
+            "auth_api_login_single_flight",
+            "Login checks executed, coalesced into one in flight, and in flight.",
+            "stat",
+            login_flights.stats,
+        )
+    if ip_limiter is not None:
+        metrics.register_gauge(
+            "auth_api_rate_limit_ip",
+            "Per client IP rate limiter counters.",
+            "stat",
+            ip_limiter.stats,
+        )
+        metrics.register_gauge(
+            "auth_api_rate_limit_user",
+            "Per (app_name, user_name) rate limiter counters.",
+            "stat",
+            user_limiter.stats,
+        )
+    if login_events is not None:
+        metrics.register_gauge(
+            "auth_api_login_events",
+            "Login events recorded, dropped while full, written and pending.",
+            "stat",
+            login_events.stats,
+        )
+    if getattr(mongo, "pool_stats", None) is not None:
+        metrics.register_gauge(
+            "auth_api_mongo_pool",
+            "MongoDB connection pool occupancy, check outs and wait time.",
+            "stat",
+            mongo.pool_stats.stats,
+        )
+    metrics.register_gauge(
+        "auth_api_collection_registry",
+        "Known collections registry counters.",
+        "stat",
+        mongo.collections.stats,
+    )
+    metrics.register_gauge(
+        "auth_api_cpu_executor",
+        "Password hashing executor occupancy.",
+        "stat",
+        lambda: {"pending": cpu_executor.pending, "capacity": cpu_executor.capacity},
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global mongo, cpu_executor, authenticator, jwks_document, log_listener
+    global login_events
+    start = time.perf_counter()
+    log_listener = setup_logging(
+        APP_NAME,
+        mode=logging_config.mode,
+        level=logging_config.level,
+        debug_sample_rate=logging_config.debug_sample_rate,
+    )
+    owns_mongo = app.state.mongo_handler is None
+    mongo, cpu_executor, login_events = None, None, None
+    # everything opened below is released by the finally block, also when
+    # the startup fails half way, e.g. with Mongo unreachable
+    try:
+        mongo = (
+            open_mongo(APP_CONFIGS["AUTH_DB"])
+            if owns_mongo
+            else app.state.mongo_handler
+        )
+        executor_config = ExecutorConfig(**APP_CONFIGS.get("CPU_EXECUTOR", {}))
+        cpu_executor = BoundedExecutor(**executor_config.model_dump())
+        authenticator = Authenticator(auth_config, cpu_executor)
+        # the key set only changes with the configuration, so it is serialized once
+        jwks_document = None
+        if authenticator.key_ring is not None:
+            jwks_body = json.dumps(authenticator.key_ring.jwks()).encode("utf-8")
+            jwks_document = (
+                jwks_body,
+                f'"{hashlib.sha256(jwks_body).hexdigest()[:32]}"',
+            )
+        if login_events_config.enabled:
+            login_events = LoginEventRecorder(
+                lambda app_name, updates: run_db(mongo.bulk_update, app_name, updates),
+                login_events_config.flush_interval,
+                login_events_config.batch_size,
+                login_events_config.max_pending,
+            )
+            login_events.start()
+        if metrics.enabled:
+            register_gauges()
+
+        # connect and load the collection registry before the first request
+        await run_db(mongo.warm_collections)
+        logging.info("Ready to serve in %.1f ms.", (time.perf_counter() - start) * 1000)
+        yield
+    finally:
+        if login_events is not None:
+            # write what is still pending before the client closes
+            await login_events.stop()
+        if cpu_executor is not None:
+            cpu_executor.shutdown()
+        if owns_mongo and mongo is not None:
+            mongo.close()
+        if log_listener is not None:
+            log_listener.stop()
+
+
+def create_app(configs: Optional[dict] = None, mongo_handler=None) -> FastAPI:
+    """Build the API for `configs`, read with `load_configs` when not given.
+
+    Only configuration is handled here; resources are opened by the lifespan
+    handler when the server starts. `mongo_handler` stands in for the
+    configured database, e.g. an in-memory one in benchmarks. The endpoints
+    share module state, so a process serves one app at a time.
+    """
+    global APP_CONFIGS, APP_NAME, TIME_ZONE, auth_config, bulk_signup_config
+    global verify_batch_config, logging_config, user_cache, login_flights
+    global ip_limiter, user_limiter, login_events_config
+
+    APP_CONFIGS = load_configs() if configs is None else configs
+    APP_NAME = APP_CONFIGS["APP_NAME"]
+    TIME_ZONE = pytz.timezone(APP_CONFIGS["TIME_ZONE"])
+    auth_config = AuthConfig(**APP_CONFIGS["AUTH_CONFIG"])
+    bulk_signup_config = BulkSignupConfig(**APP_CONFIGS.get("BULK_SIGNUP", {}))
+    verify_batch_config = VerifyBatchConfig(**APP_CONFIGS.get("VERIFY_BATCH", {}))
+    logging_config = AppLoggingConfig(**APP_CONFIGS.get("APP_LOGGING", {}))
+    login_events_config = LoginEventsConfig(**APP_CONFIGS.get("LOGIN_EVENTS", {}))
+    metrics.enabled = MetricsConfig(**APP_CONFIGS.get("METRICS", {})).enabled
+
+    user_cache_config = UserCacheConfig(**APP_CONFIGS.get("USER_CACHE", {}))
+    user_cache = (
+        UserRecordCache(user_cache_config.max_size, user_cache_config.ttl)
+        if user_cache_config.enabled
+        else None
+    )
+    single_flight_config = SingleFlightConfig(
+        **APP_CONFIGS.get("LOGIN_SINGLE_FLIGHT", {})
+    )
+    login_flights = SingleFlight() if single_flight_config.enabled else None
+    rate_limit_config = RateLimitConfig(**APP_CONFIGS.get("RATE_LIMIT", {}))
+    fast_login_config = FastLoginConfig(**APP_CONFIGS.get("FAST_LOGIN", {}))
+    ip_limiter = user_limiter = None
+    if rate_limit_config.enabled:
+        ip_limiter = TokenBucketLimiter(
+            rate_limit_config.ip_rate,
+            rate_limit_config.ip_burst,
+            rate_limit_config.max_keys,
+        )
+        user_limiter = TokenBucketLimiter(
+            rate_limit_config.user_rate,
+            rate_limit_config.user_burst,
+            rate_limit_config.max_keys,
+        )
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.mongo_handler = mongo_handler
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    if logging_config.request_summary or logging_config.debug_sample_rate < 1.0:
+        app.add_middleware(
+            RequestLoggingMiddleware,
+            debug_sample_rate=logging_config.debug_sample_rate,
+            summary=logging_config.request_summary,
+        )
+    if metrics.enabled:
+        app.add_middleware(RequestMetricsMiddleware)
+    if fast_login_config.enabled:
+        # registered ahead of the router, so it shadows the validated route
+        app.router.routes.append(
+            LabelledRoute(
+                "/auth-api/v1/login",
+                fast_login,
+                methods=["POST"],
+                include_in_schema=False,
+            )
+        )
+    app.include_router(router)
+    return app
+
+
+def __getattr__(name: str):
+    # `auth_api.app.api:app` keeps working for ASGI servers and imports, but
+    # the default app is only built on first access, not when importing.
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+async def run_db(method, *args, **kwargs):
+    """Await a data layer call, off-loading blocking drivers to the threadpool."""
+    if inspect.iscoroutinefunction(method):
+        return await method(*args, **kwargs)
+    return await run_in_threadpool(method, *args, **kwargs)
+
+
+def cpu_saturated_response(err: ExecutorSaturatedError) -> JSONResponse:
+    """Shed load fast while the password hashing queue is full."""
+    logging.warning("CPU executor saturated, rejecting request.")
+    return JSONResponse(
+        content={
+            "status": "SERVICE_BUSY",
+            "message": "Server is busy, please retry later.",
+        },
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(err.retry_after)},
+    )
+
+
+def missing_unique_index_response(err: MissingUniqueIndexError) -> JSONResponse:
+    """Refuse signups the unique indexes could not check for duplicates."""
+    logging.error("Rejected a signup: %s.", err)
+    return JSONResponse(
+        content={
+            "status": "SIGNUP_UNAVAILABLE",
+            "message": f"Signups to '{err.collection_name}' are unavailable until "
+            "its duplicated users are cleaned up.",
+        },
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+def rate_limit_response(
+    request: Request, app_name: str, user_name: str
+) -> Optional[JSONResponse]:
+    """Turn away a client or account over its budget, before any password hashing."""
+    if ip_limiter is None:
+        return None
+    client_ip = request.client.host if request.client else "unknown"
+    allowed, retry_after = ip_limiter.acquire(client_ip)
+    if allowed:
+        allowed, retry_after = user_limiter.acquire((app_name, user_name))
+    if allowed:
+        return None
+    return JSONResponse(
+        content={
+            "status": "TOO_MANY_REQUESTS",
+            "message": "Too many attempts, please retry later.",
+        },
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={"Retry-After": str(math.ceil(retry_after))},
+    )
+
+
+def duplicated_user_message(duplicated_field: str) -> str:
+    if duplicated_field == "user_id":
+        return "User id already being used, use another user id!"
+    return "User with this name already exist ! Choose another user_name."
+
+
+DUPLICATED_USER = {
+    field: FixedResponse(
+        {"status": "FAILED", "message": duplicated_user_message(field)},
+        status.HTTP_403_FORBIDDEN,
+    )
+    for field in ("user_name", "user_id")
+}
+
+
+def build_user_document(
+    user: RegisterRequest, hashed_password: str, expire: datetime
+) -> dict:
+    payload = RegisterPayload(
+        **user.model_dump(), expire=expire.strftime("%Y-%m-%d %H:%M:%S")
+    )
+    return {
+        "user_id": user.user_id,
+        "user_name": user.user_name,
+        "password": hashed_password,
+        "token": authenticator.create_jwt_token(payload, hashed_password, expire),
+        "role": user.role,
+    }
+
+
+async def migrate_password_hash(app_name: str, user_name: str, password: str) -> None:
+    """Re-hash a password stored with outdated hashing settings."""
+    hashed_password = await authenticator.hash_password_async(password)
+    await run_db(
+        mongo.upsert, app_name, {"user_name": user_name}, {"password": hashed_password}
+    )
+    invalidate_user(app_name, user_name)
+    logging.info("Upgraded password hash of user %s.", user_name)
+
+
+async def get_user(app_name: str, user_name: str) -> Optional[UserRecord]:
+    """Fetch a user record by name, through the user cache when it is enabled."""
+
+    async def load():
+        document = await run_db(
+            mongo.get_document,
+            app_name,
+            {"user_name": user_name},
+            UserRecord.PROJECTION,
+        )
+        return UserRecord.from_document(document)
+
+    if user_cache is None:
+        return await load()
+    return await user_cache.get(app_name, user_name, load)
+
+
+def invalidate_user(app_name: str, user_name: str) -> None:
+    """Drop a changed user record from the cache, before answering the write."""
+    if user_cache is not None:
+        user_cache.invalidate(app_name, user_name)
 
 
 # Define API Endpoints
 
 
-@app.post("/auth-api/v1/signup")
-def singup(body_request: RegisterRequest) -> JSONResponse:
+@router.post("/auth-api/v1/signup")
+async def singup(body_request: RegisterRequest, request: Request) -> JSONResponse:
+    limited = rate_limit_response(
+        request, body_request.app_name, body_request.user_name
+    )
+    if limited is not None:
+        return limited
     try:
-        mongo.create_collection_if_not_exist(body_request.app_name)
-        hashed_password = authenticator.hash_password(body_request.password)
+        await run_db(mongo.create_collection_if_not_exist, body_request.app_name)
+        hashed_password = await authenticator.hash_password_async(body_request.password)
         delta_params = delta_parse(APP_CONFIGS["TIME_DELTA"])
         expire = datetime.now(tz=TIME_ZONE) + timedelta(**delta_params)
         payload = RegisterPayload(
             **body_request.model_dump(), expire=expire.strftime("%Y-%m-%d %H:%M:%S")
         )
-        token = authenticator.create_jwt_token(payload)
+        token = await authenticator.create_jwt_token_async(
+            payload, hashed_password, expire
+        )
         document = {
             "user_id": body_request.user_id,
             "user_name": body_request.user_name,
@@ -66,37 +549,21 @@ def singup(body_request: RegisterRequest) -> JSONResponse:
             "token": token,
             "role": body_request.role,
         }
-        user_name_exists = mongo.get_document(
-            body_request.app_name, filter_query={"user_name": body_request.user_name}
-        )
-        userid_used = mongo.get_document(
-            body_request.app_name, filter_query={"user_id": body_request.user_id}
-        )
+        # unique indexes on user_name and user_id reject duplicates atomically
+        await run_db(mongo.create, body_request.app_name, document)
+        invalidate_user(body_request.app_name, body_request.user_name)
+        response = SIGNUP_SUCCESS()
+        logging.debug("new user recorded successfully !")
 
-        if userid_used:
-            response = JSONResponse(
-                content={
-                    "status": "FAILED",
-                    "message": "User id already being used, use another user id!",
-                },
-                status_code=status.HTTP_403_FORBIDDEN,
-            )
+    except DuplicateKeyError as err:
+        duplicated_field = duplicated_key(err.details or {})
+        response = DUPLICATED_USER.get(duplicated_field, DUPLICATED_USER["user_name"])()
 
-        elif not user_name_exists:
-            mongo.create(body_request.app_name, document)
-            response = JSONResponse(
-                content={"status": "SUCCESS"}, status_code=status.HTTP_200_OK
-            )
-            logging.info("new user recorded successfully !")
+    except MissingUniqueIndexError as err:
+        response = missing_unique_index_response(err)
 
-        else:
-            response = JSONResponse(
-                content={
-                    "status": "FAILED",
-                    "message": "User with this name already exist ! Choose another user_name.",
-                },
-                status_code=status.HTTP_403_FORBIDDEN,
-            )
+    except ExecutorSaturatedError as err:
+        response = cpu_saturated_response(err)
 
     except Exception as err:
         response = JSONResponse(
@@ -107,98 +574,246 @@ def singup(body_request: RegisterRequest) -> JSONResponse:
     return response
 
 
-@app.post("/auth-api/v1/login")
-def login(body_request: LoginRequest) -> JSONResponse:
+@router.post("/auth-api/v1/signup/bulk")
+async def bulk_signup(body_request: BulkRegisterRequest) -> JSONResponse:
+    users = body_request.users
+    if len(users) > bulk_signup_config.max_items:
+        return JSONResponse(
+            content={
+                "status": "FAILED",
+                "message": f"Bulk signup accepts at most {bulk_signup_config.max_items} users per request.",
+            },
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+
     try:
-        hashed_password = authenticator.hash_password(body_request.password)
-        now = datetime.now(tz=TIME_ZONE)
-        document = mongo.get_document(
-            body_request.app_name,
-            {"user_name": body_request.user_name, "password": hashed_password},
+        start = time.perf_counter()
+        positions_by_app = defaultdict(list)
+        for position, user in enumerate(users):
+            positions_by_app[user.app_name].append(position)
+        for app_name in positions_by_app:
+            await run_db(mongo.create_collection_if_not_exist, app_name)
+
+        hashed_passwords = await authenticator.hash_passwords_async(
+            [user.password for user in users]
+        )
+        delta_params = delta_parse(APP_CONFIGS["TIME_DELTA"])
+        expire = datetime.now(tz=TIME_ZONE) + timedelta(**delta_params)
+        documents = await run_in_threadpool(
+            lambda: [
+                build_user_document(user, hashed_password, expire)
+                for user, hashed_password in zip(users, hashed_passwords)
+            ]
         )
 
-        if document is None:
-            response = JSONResponse(
-                content={
-                    "status": "USER_NOT_EXIST",
-                    "message": "User does not exist  or password is incorret! Try to signup.",
-                },
-                status_code=status.HTTP_403_FORBIDDEN,
-            )
-            return response
+        results = [
+            {"user_id": user.user_id, "user_name": user.user_name, "status": "SUCCESS"}
+            for user in users
+        ]
+        chunk_size = bulk_signup_config.chunk_size
+        for app_name, positions in positions_by_app.items():
+            for chunk_start in range(0, len(positions), chunk_size):
+                chunk = positions[chunk_start : chunk_start + chunk_size]
+                write_errors = await run_db(
+                    mongo.create_many, app_name, [documents[p] for p in chunk]
+                )
+                for position in chunk:
+                    invalidate_user(app_name, users[position].user_name)
+                for write_error in write_errors:
+                    result = results[chunk[write_error["index"]]]
+                    if write_error["code"] == DUPLICATE_KEY:
+                        result["status"] = "DUPLICATED"
+                        result["message"] = duplicated_user_message(
+                            duplicated_key(write_error)
+                        )
+                    else:
+                        result["status"] = "FAILED"
+                        result["message"] = write_error.get("errmsg", "")
 
-        token = document["token"]
-        status_auth = authenticator.validate_jwt_token(token, now, TIME_ZONE)
+        elapsed = time.perf_counter() - start
+        summary = defaultdict(int)
+        for result in results:
+            summary[result["status"]] += 1
+        logging.info(
+            "bulk signup recorded %s of %s users in %.2fs",
+            summary["SUCCESS"],
+            len(users),
+            elapsed,
+        )
+        response = JSONResponse(
+            content={
+                "status": "SUCCESS" if summary["SUCCESS"] == len(users) else "PARTIAL",
+                "inserted": summary["SUCCESS"],
+                "duplicated": summary["DUPLICATED"],
+                "failed": summary["FAILED"],
+                "elapsed_seconds": round(elapsed, 4),
+                "users_per_second": round(len(users) / elapsed, 2) if elapsed else None,
+                "results": results,
+            },
+            status_code=status.HTTP_200_OK,
+        )
+
+    except MissingUniqueIndexError as err:
+        response = missing_unique_index_response(err)
+
+    except ExecutorSaturatedError as err:
+        response = cpu_saturated_response(err)
 
-        if status_auth == "VALID_TOKEN":
-            response = JSONResponse(
-                content={"status": "AUTH_SUCCESS"}, status_code=status.HTTP_200_OK
-            )
-        elif status_auth == "TOKEN_EXPIRED":
-            response = JSONResponse(
-                content={
-                    "status": "AUTH_FAILED",
-                    "message": "Token has expired, please renew your credentials",
-                },
-                status_code=status.HTTP_403_FORBIDDEN,
-            )
-        elif status_auth == "INVALID_TOKEN":
-            response = JSONResponse(
-                content={
-                    "status": "AUTH_FAILED",
-                    "message": "Token is invalid, enter in contact with your administrator",
-                },
-                status_code=status.HTTP_403_FORBIDDEN,
-            )
     except Exception as err:
-        logging.error(f"Login has failed: \n\n {err}")
+        response = JSONResponse(
+            content={
+                "status": "FAILED",
+                "message": f" bulk sign up failed due to {err}",
+            },
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
 
     return response
 
 
-@app.post("/auth-api/v1/renew-credentials")
-def renew_credentials(body_request: RenewCredentialsRequest) -> JSONResponse:
+async def authenticate(app_name: str, user_name: str, password: str) -> str:
+    """Check login credentials, answering the stored token status when they match.
+
+    USER_NOT_EXIST and WRONG_PASSWORD get the same response, only the login
+    events tell them apart.
+    """
+    now = datetime.now(tz=TIME_ZONE)
+    # served by the user_name_unique index, an unknown user costs no bcrypt round
+    user = await get_user(app_name, user_name)
+
+    if user is None:
+        return "USER_NOT_EXIST"
+    if not await authenticator.verify_password_async(password, user.password):
+        return "WRONG_PASSWORD"
+
+    if authenticator.needs_rehash(user.password):
+        await migrate_password_hash(app_name, user_name, password)
+
+    return authenticator.validate_jwt_token(user.token, now, TIME_ZONE)
+
+
+def decode_login(body: bytes) -> tuple:
+    """Read (app_name, user_name, password) from a login body without the model.
+
+    Anything but an object with those three strings is handed to LoginRequest,
+    so invalid bodies still get FastAPI's usual 422 detail.
+    """
     try:
-        hashed_old_password = authenticator.hash_password(body_request.old_password)
-        hashed_new_password = authenticator.hash_password(body_request.new_password)
-        filter = {"user_name": body_request.user_name, "password": hashed_old_password}
-        document = mongo.get_document(
-            body_request.app_name,
-            {"user_name": body_request.user_name, "password": hashed_old_password},
+        fields = orjson.loads(body)
+        credentials = (fields["app_name"], fields["user_name"], fields["password"])
+        if all(type(value) is str for value in credentials):
+            return credentials
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        pass
+    try:
+        login_request = LoginRequest.model_validate_json(body)
+    except ValidationError as err:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in err.errors()]
         )
+    return login_request.app_name, login_request.user_name, login_request.password
 
-        if document is None:
-            response = JSONResponse(
-                content={
-                    "status": "ERROR",
-                    "message": "The password offered doesn't matched with current password or user does not exist.",
-                },
-                status_code=status.HTTP_403_FORBIDDEN,
-            )
 
-        elif hashed_new_password == document["password"]:
-            response = JSONResponse(
-                content={
-                    "status": "ERROR",
-                    "message": "Not allowed using previous password",
-                },
-                status_code=status.HTTP_403_FORBIDDEN,
+async def fast_login(request: Request) -> Response:
+    """Login as a bare Starlette route, enabled by FAST_LOGIN, see decode_login."""
+    return await login_response(request, *decode_login(await request.body()))
+
+
+def record_login(app_name: str, user_name: str, success: bool) -> None:
+    """Count a login attempt on an existing user, when LOGIN_EVENTS is enabled.
+
+    Unknown user names are left out, so a spray of random names cannot fill
+    the pending events and push out those of real users.
+    """
+    if login_events is not None:
+        login_events.record(app_name, user_name, success)
+
+
+async def login_response(
+    request: Request, app_name: str, user_name: str, password: str
+) -> Response:
+    limited = rate_limit_response(request, app_name, user_name)
+    if limited is not None:
+        return limited
+    try:
+        credentials = (app_name, user_name, password)
+        if login_flights is None:
+            status_auth = await authenticate(*credentials)
+        else:
+            # identical requests in flight share one bcrypt round and Mongo query
+            status_auth = await login_flights.do(
+                login_flights.fingerprint(*credentials),
+                lambda: authenticate(*credentials),
             )
+
+        response = LOGIN_RESPONSES[status_auth]()
+        # a correct password with an expired or invalid stored token is neither
+        if status_auth in ("VALID_TOKEN", "WRONG_PASSWORD"):
+            record_login(app_name, user_name, status_auth == "VALID_TOKEN")
+    except ExecutorSaturatedError as err:
+        response = cpu_saturated_response(err)
+    except Exception as err:
+        logging.error("Login has failed: \n\n %s", err)
+        response = LOGIN_FAILED()
+
+    return response
+
+
+@router.post("/auth-api/v1/login")
+async def login(body_request: LoginRequest, request: Request) -> JSONResponse:
+    return await login_response(
+        request, body_request.app_name, body_request.user_name, body_request.password
+    )
+
+
+@router.post("/auth-api/v1/renew-credentials")
+async def renew_credentials(
+    body_request: RenewCredentialsRequest, request: Request
+) -> JSONResponse:
+    limited = rate_limit_response(
+        request, body_request.app_name, body_request.user_name
+    )
+    if limited is not None:
+        return limited
+    try:
+        filter = {"user_name": body_request.user_name}
+        user = await get_user(body_request.app_name, body_request.user_name)
+
+        if user is None or not await authenticator.verify_password_async(
+            body_request.old_password, user.password
+        ):
+            response = WRONG_OLD_PASSWORD()
+
+        elif body_request.new_password == body_request.old_password:
+            response = PASSWORD_REUSED()
         else:
+            hashed_new_password = await authenticator.hash_password_async(
+                body_request.new_password
+            )
             delta_params = delta_parse(APP_CONFIGS["TIME_DELTA"])
             expire = datetime.now(tz=TIME_ZONE) + timedelta(**delta_params)
             payload = RegisterPayload(
                 app_name=body_request.app_name,
-                user_id=document["user_id"],
+                user_id=user.user_id,
                 user_name=body_request.user_name,
                 password=hashed_new_password,
-                role=document["role"],
+                role=user.role,
                 expire=expire.strftime("%Y-%m-%d %H:%M:%S"),
             )
-            token = authenticator.create_jwt_token(payload)
+            token = await authenticator.create_jwt_token_async(
+                payload, hashed_new_password, expire
+            )
             new_doc = {**payload.model_dump(), "token": token}
-            mongo.upsert(body_request.app_name, filter, new_doc)
-            user_id = document["user_id"]
+            await run_db(mongo.upsert, body_request.app_name, filter, new_doc)
+            invalidate_user(body_request.app_name, body_request.user_name)
+            authenticator.invalidate_token(user.token)
+            # sessions opened with the old password must not outlive it
+            await run_db(
+                mongo.delete_documents,
+                body_request.app_name,
+                {"owner_name": body_request.user_name},
+            )
+            user_id = user.user_id
             response = JSONResponse(
                 content={
                     "status": "SUCCESS",
@@ -206,25 +821,232 @@ def renew_credentials(body_request: RenewCredentialsRequest) -> JSONResponse:
                 }
             )
 
+    except ExecutorSaturatedError as err:
+        response = cpu_saturated_response(err)
+    except Exception as err:
+        logging.error("Failed to renew user credentials: \n\n%s", err)
+        response = RENEW_FAILED()
+
+    return response
+
+
+async def issue_tokens(
+    app_name: str, user_name: str, user_id: int, role: str
+) -> JSONResponse:
+    """Answer a fresh access token with a new single use refresh token."""
+    access_token, expires_in = authenticator.create_access_token(
+        user_name, user_id, app_name, role
+    )
+    refresh_token, digest, expires_at = authenticator.new_refresh_token()
+    # not a signup: no need to wait for the signup write concern
+    await run_db(
+        mongo.create_token,
+        app_name,
+        {
+            "refresh_token": digest,
+            "owner_name": user_name,
+            "owner_id": user_id,
+            "role": role,
+            "expires_at": expires_at,
+        },
+    )
+    return JSONResponse(
+        content={
+            "status": "SUCCESS",
+            "token_type": "Bearer",
+            "access_token": access_token,
+            "expires_in": expires_in,
+            "refresh_token": refresh_token,
+            "refresh_expires_in": auth_config.refresh_token_ttl,
+        },
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@router.post("/auth-api/v1/token")
+async def token(body_request: LoginRequest, request: Request) -> JSONResponse:
+    """Trade a password for an access token and a refresh token."""
+    limited = rate_limit_response(
+        request, body_request.app_name, body_request.user_name
+    )
+    if limited is not None:
+        return limited
+    try:
+        user = await get_user(body_request.app_name, body_request.user_name)
+        if user is None:
+            return USER_NOT_EXIST()
+        if not await authenticator.verify_password_async(
+            body_request.password, user.password
+        ):
+            record_login(body_request.app_name, body_request.user_name, False)
+            return USER_NOT_EXIST()
+
+        if authenticator.needs_rehash(user.password):
+            await migrate_password_hash(
+                body_request.app_name, body_request.user_name, body_request.password
+            )
+        response = await issue_tokens(
+            body_request.app_name,
+            body_request.user_name,
+            user.user_id,
+            user.role,
+        )
+        record_login(body_request.app_name, body_request.user_name, True)
+
+    except ExecutorSaturatedError as err:
+        response = cpu_saturated_response(err)
     except Exception as err:
-        logging.error(f"Failed to renew user credentials: \n\n{err}")
+        logging.error("Token issuing has failed: \n\n%s", err)
+        response = TOKEN_FAILED()
+
+    return response
+
+
+@router.post("/auth-api/v1/token/refresh")
+async def refresh_token(body_request: RefreshTokenRequest) -> JSONResponse:
+    """Rotate a refresh token into new tokens, without bcrypt or a password."""
+    try:
+        # popped, so a refresh token can be redeemed once only
+        document = await run_db(
+            mongo.pop_document,
+            body_request.app_name,
+            {
+                "refresh_token": authenticator.refresh_token_digest(
+                    body_request.refresh_token
+                )
+            },
+        )
+        if document is None:
+            return INVALID_REFRESH_TOKEN()
+
+        # the TTL monitor runs about once a minute, so expiry is checked here too
+        expires_at = document["expires_at"]
+        if expires_at.tzinfo is None:
+            expires_at = pytz.utc.localize(expires_at)
+        if expires_at <= datetime.now(tz=pytz.utc):
+            return REFRESH_TOKEN_EXPIRED()
+
+        # the owner may have been removed or changed role since the last rotation
+        user = await get_user(body_request.app_name, document["owner_name"])
+        if user is None:
+            return INVALID_REFRESH_TOKEN()
+
+        response = await issue_tokens(
+            body_request.app_name, user.user_name, user.user_id, user.role
+        )
+
+    except Exception as err:
+        logging.error("Token refresh has failed: \n\n%s", err)
+        response = REFRESH_FAILED()
+
+    return response
+
+
+@router.get("/auth-api/v1/verify")
+async def verify(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> JSONResponse:
+    """Check a bearer token by signature and expiry only, without Mongo or bcrypt."""
+    if credentials is None:
+        status_auth, claims = "INVALID_TOKEN", None
+    else:
+        now = datetime.now(tz=TIME_ZONE)
+        status_auth, claims = authenticator.decode_jwt_token(
+            credentials.credentials, now, TIME_ZONE
+        )
+
+    if status_auth == "VALID_TOKEN":
         response = JSONResponse(
+            content={"status": status_auth, "claims": claims},
+            status_code=status.HTTP_200_OK,
+        )
+    elif status_auth == "TOKEN_EXPIRED":
+        response = VERIFY_TOKEN_EXPIRED()
+    else:
+        response = VERIFY_INVALID_TOKEN()
+
+    return response
+
+
+@router.post("/auth-api/v1/verify/batch")
+async def verify_batch(body_request: VerifyBatchRequest) -> JSONResponse:
+    """Validate many tokens at once, answering their statuses in request order."""
+    tokens = body_request.tokens
+    if len(tokens) > verify_batch_config.max_batch_size:
+        return JSONResponse(
             content={
-                "status": "ERROR",
-                "message": "Failed to renew user credentials, please contact your administrator.",
+                "status": "FAILED",
+                "message": f"Batch verification accepts at most {verify_batch_config.max_batch_size} tokens.",
             },
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
         )
 
-    return response
+    now = datetime.now(tz=TIME_ZONE)
+    # repeated tokens are decoded once per batch
+    statuses = {
+        token: authenticator.validate_jwt_token(token, now, TIME_ZONE)
+        for token in dict.fromkeys(tokens)
+    }
+    return JSONResponse(
+        content={"results": [statuses[token] for token in tokens]},
+        status_code=status.HTTP_200_OK,
+    )
 
 
-if __name__ == "__main__":
-    api_configs = APP_CONFIGS["API_CONFIGS"]
-    uvicorn.run(
-        app,
-        log_level=api_configs["LOG_LEVEL"],
-        port=api_configs["PORT"],
-        log_config=APP_CONFIGS["LOGGING_CONFIG"],
-        host=api_configs["HOST"],
+@router.get("/.well-known/jwks.json")
+async def jwks(request: Request) -> Response:
+    """Public signing keys, so other services can verify tokens on their own."""
+    if jwks_document is None:
+        return NO_PUBLIC_KEYS()
+    body, etag = jwks_document
+    headers = {
+        "Cache-Control": f"public, max-age={auth_config.jwks_max_age}",
+        "ETag": etag,
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@router.get("/ready")
+async def ready() -> JSONResponse:
+    """Readiness probe: started, and MongoDB answers a ping in time.
+
+    The pool counters are reported either way; waiters and wait time show
+    requests queueing for a connection. A busy pool alone does not fail the
+    probe, which would only move the burst to the other instances.
+    """
+    if mongo is None:
+        return JSONResponse(
+            content={"status": "NOT_READY", "message": "Still starting up."},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    pool_stats = getattr(mongo, "pool_stats", None)
+    content = {"pool": pool_stats.stats() if pool_stats is not None else None}
+    try:
+        await asyncio.wait_for(run_db(mongo.ping), READY_PING_TIMEOUT)
+    except Exception as err:
+        logging.warning("Readiness check failed: %r", err)
+        return JSONResponse(
+            content={
+                "status": "NOT_READY",
+                "message": "MongoDB is not reachable.",
+                **content,
+            },
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    return JSONResponse(content={"status": "READY", **content})
+
+
+@router.get("/metrics")
+async def export_metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint, empty while metrics are disabled."""
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
     )
+
+
+if __name__ == "__main__":
+    from auth_api.app.server import serve
+
+    serve()
@@ -1,83 +1,409 @@
+import asyncio
+import hashlib
 import logging
+import os
+import secrets
+import time
 from datetime import datetime, timedelta
-from typing import Union
+from typing import List, Optional, Tuple, Union
 
-import bcrypt
 import jwt
 import pytz
 from pytz import timezone
 
+from auth_api.app.hashers import (
+    HASHERS,
+    PasswordHasher,
+    build_hasher,
+    identify_hasher,
+)
 from auth_api.app.models import AuthConfig, LoginPayload, RegisterPayload
+from auth_api.utils.cache import LRUCache
+from auth_api.utils.executors import BoundedExecutor
+from auth_api.utils.metrics import STAGE_SECONDS, metrics, time_stage
+
+
+def _hash_many(hasher: PasswordHasher, passwords: List[bytes]) -> List[str]:
+    """Hash a chunk of passwords in one executor job (module level, so picklable)."""
+    return [hasher.hash(password) for password in passwords]
+
+
+def _timed(func, *args) -> Tuple[object, float]:
+    """Run `func` in an executor job, returning its result and run time."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
 
 
 class Authenticator:
-    def __init__(self, configs: AuthConfig):
+    def __init__(self, configs: AuthConfig, executor: Optional[BoundedExecutor] = None):
         self.secret_key = configs.secret_key
         self.algorithm = configs.algorithm
         self.expire_delta = configs.expire_delta  # minutes
         self.encrypt_key = configs.encrypt_key
-        self.salt = configs.salt
+        self.hasher = build_hasher(configs.password_hasher, configs.hasher_params)
+        # stored hashes made by other algorithms can still be verified
+        self._verifiers = {
+            algorithm: self.hasher if algorithm == self.hasher.algorithm else hasher()
+            for algorithm, hasher in HASHERS.items()
+        }
+        # hashes made before per-user salts all start with the old global salt
+        self.legacy_salt = configs.salt.decode("utf-8") if configs.salt else None
+        self.executor = executor
+        self.key_ring = None
+        if configs.signing_keys:
+            # PEM loading pulls in more of cryptography, only import it when used
+            from auth_api.app.keys import KeyRing
 
-    def create_jwt_token(self, payload: RegisterPayload) -> str:
+            self.key_ring = KeyRing(configs.signing_keys, configs.active_kid)
+        # digest of verified token -> its claims, skips jwt.decode on repeats
+        self.token_version = configs.token_version
+        self.token_leeway = configs.token_leeway  # seconds
+        self.accept_v1_tokens = configs.accept_v1_tokens
+        self.access_token_ttl = configs.access_token_ttl  # seconds
+        self.refresh_token_ttl = configs.refresh_token_ttl  # seconds
+        self.token_cache = (
+            LRUCache(configs.token_cache_size) if configs.token_cache_size else None
+        )
+        workers = executor.max_workers if executor else os.cpu_count() or 1
+        self.bulk_hash_chunk_size = configs.bulk_hash_chunk_size
+        # leave a worker free for logins and signups while a bulk request runs
+        self.bulk_hash_jobs = configs.bulk_hash_jobs or max(1, workers - 1)
+        self._bulk_slots: Optional[asyncio.Semaphore] = None
+
+    def create_jwt_token(
+        self,
+        payload: RegisterPayload,
+        hashed_password: Optional[str] = None,
+        expire_at: Optional[datetime] = None,
+    ) -> str:
 
         try:
-            logging.info("Creating JWT Token...")
+            logging.debug("Creating JWT Token...")
+            if self.token_version == 2:
+                return self._encode(
+                    self._claims_v2(
+                        payload.user_name,
+                        payload.user_id,
+                        payload.app_name,
+                        payload.role,
+                        expire_at,
+                    )
+                )
             jwt_payload = payload.model_dump()
-            jwt_payload["password"] = self.hash_password(jwt_payload["password"])
-            token = jwt.encode(jwt_payload, self.secret_key, algorithm=self.algorithm)
-            logging.info("Created token succefully.")
+            if hashed_password is None:
+                hashed_password = self.hash_password(jwt_payload["password"])
+            jwt_payload["password"] = hashed_password
+            token = self._encode(jwt_payload)
+            logging.debug("Created token succefully.")
             return token
         except Exception as err:
-            logging.error(f"Error when try to create token: {err}")
+            logging.error("Error when try to create token: %s", err)
             raise err
 
-    def validate_jwt_token(
-        self, token_to_validate, now: datetime, tz: timezone
-    ) -> Union[str, LoginPayload]:
+    async def create_jwt_token_async(
+        self,
+        payload: RegisterPayload,
+        hashed_password: Optional[str] = None,
+        expire_at: Optional[datetime] = None,
+    ) -> str:
+        """Same as create_jwt_token, hashing the password on the CPU executor.
+
+        Callers that already hold the password hash pass it as `hashed_password`
+        to skip the second bcrypt round. v2 tokens carry no password at all.
+        """
         try:
-            logging.info("Validating token...")
-            decoded = jwt.decode(
-                token_to_validate, self.secret_key, algorithms=[self.algorithm]
+            logging.debug("Creating JWT Token...")
+            if self.token_version == 2:
+                return self._encode(
+                    self._claims_v2(
+                        payload.user_name,
+                        payload.user_id,
+                        payload.app_name,
+                        payload.role,
+                        expire_at,
+                    )
+                )
+            jwt_payload = payload.model_dump()
+            if hashed_password is None:
+                hashed_password = await self.hash_password_async(
+                    jwt_payload["password"]
+                )
+            jwt_payload["password"] = hashed_password
+            token = self._encode(jwt_payload)
+            logging.debug("Created token succefully.")
+            return token
+        except Exception as err:
+            logging.error("Error when try to create token: %s", err)
+            raise err
+
+    def create_access_token(
+        self, user_name: str, user_id: int, app_name: str, role: str
+    ) -> Tuple[str, int]:
+        """Short lived v2 token checked by signature alone, with its lifetime."""
+        expire_at = datetime.now(tz=pytz.utc) + timedelta(seconds=self.access_token_ttl)
+        token = self._encode(
+            self._claims_v2(user_name, user_id, app_name, role, expire_at)
+        )
+        return token, self.access_token_ttl
+
+    def new_refresh_token(self) -> Tuple[str, str, datetime]:
+        """Opaque refresh token, the digest stored in its place and its expiry."""
+        refresh_token = secrets.token_urlsafe(32)
+        expires_at = datetime.now(tz=pytz.utc) + timedelta(
+            seconds=self.refresh_token_ttl
+        )
+        return refresh_token, self.refresh_token_digest(refresh_token), expires_at
+
+    @staticmethod
+    def refresh_token_digest(refresh_token: str) -> str:
+        return hashlib.sha256(refresh_token.encode("utf-8")).hexdigest()
+
+    def _claims_v2(
+        self,
+        user_name: str,
+        user_id: int,
+        app_name: str,
+        role: str,
+        expire_at: Optional[datetime],
+    ) -> dict:
+        """Registered claims as integers, without any password material."""
+        issued_at = int(time.time())
+        if expire_at is not None:
+            expires = int(expire_at.timestamp())
+        else:
+            expires = issued_at + self.expire_delta * 60
+        return {
+            "sub": user_name,
+            "user_id": user_id,
+            "app_name": app_name,
+            "role": role,
+            "iat": issued_at,
+            "exp": expires,
+        }
+
+    def _encode(self, jwt_payload: dict) -> str:
+        """Sign with the active key of the ring, or the shared secret without one."""
+        with time_stage("authenticator", "jwt_encode"):
+            if self.key_ring is None:
+                return jwt.encode(
+                    jwt_payload, self.secret_key, algorithm=self.algorithm
+                )
+            key = self.key_ring.active
+            return jwt.encode(
+                jwt_payload,
+                key.private_key,
+                algorithm=key.algorithm,
+                headers={"kid": key.kid},
             )
-            expire = datetime.strptime(decoded["expire"], "%Y-%m-%d %H:%M:%S").replace(
-                tzinfo=tz
+
+    def _decode(self, token: str) -> dict:
+        """Check the signature with the key named by the token's kid header.
+
+        Tokens without a kid were signed with the shared secret before the key
+        ring was configured and are still checked against it.
+        """
+        with time_stage("authenticator", "jwt_decode"):
+            kid = None
+            if self.key_ring is not None:
+                kid = jwt.get_unverified_header(token).get("kid")
+            if kid is None:
+                return jwt.decode(
+                    token,
+                    self.secret_key,
+                    algorithms=[self.algorithm],
+                    leeway=self.token_leeway,
+                )
+            key = self.key_ring.get(kid)
+            if key is None:
+                raise jwt.InvalidTokenError(f"Unknown signing key '{kid}'")
+            return jwt.decode(
+                token,
+                key.public_key,
+                algorithms=[key.algorithm],
+                leeway=self.token_leeway,
             )
-            now_norm = now.replace(tzinfo=tz)
 
-            if now_norm > expire:
-                status = "TOKEN_EXPIRED"
-                logging.error("Token is expired, please renew your credentials")
+    def validate_jwt_token(
+        self, token_to_validate, now: datetime, tz: timezone
+    ) -> Union[str, LoginPayload]:
+        status, _ = self.decode_jwt_token(token_to_validate, now, tz)
+        return status
+
+    def decode_jwt_token(
+        self, token_to_validate, now: datetime, tz: timezone
+    ) -> Tuple[str, Optional[dict]]:
+        """Validate a token and return its status with its public claims.
+
+        Expiry times are compared as real Unix timestamps, as v2 exp claims
+        are. A v1 expire string is a wall clock time in `tz`, read the way it
+        was written: with `replace(tzinfo=tz)` on both sides, which a pytz zone
+        resolves to its LMT offset, then shifted back to real time.
+        """
+        now_ts = now.timestamp()
+        if self.token_cache is not None:
+            token_key = self._token_key(token_to_validate)
+            # expired entries are evicted by the cache, so a hit is a valid token
+            cached = self.token_cache.get(token_key, now=now_ts)
+            if cached is not None:
+                logging.debug("Token Validated with success (cached).")
+                return "VALID_TOKEN", cached
+
+        claims = None
+        try:
+            logging.debug("Validating token...")
+            # PyJWT checks the exp claim of v2 tokens itself
+            decoded = self._decode(token_to_validate)
+            if "exp" in decoded:
+                expires_at = decoded["exp"] + self.token_leeway
+            elif self.accept_v1_tokens and "expire" in decoded:
+                expire = datetime.strptime(decoded["expire"], "%Y-%m-%d %H:%M:%S")
+                skew = now.replace(tzinfo=tz).timestamp() - now_ts
+                expires_at = (
+                    expire.replace(tzinfo=tz).timestamp() - skew + self.token_leeway
+                )
             else:
-                status = "VALID_TOKEN"
-                logging.info("Token Validated with success.")
+                raise jwt.InvalidTokenError("Token format is not accepted")
+
+            if now_ts > expires_at:
+                raise jwt.ExpiredSignatureError("Signature has expired")
+            status = "VALID_TOKEN"
+            logging.debug("Token Validated with success.")
+            claims = {k: v for k, v in decoded.items() if k != "password"}
+            if self.token_cache is not None:
+                self.token_cache.set(token_key, claims, expires_at=expires_at)
+
+        except jwt.ExpiredSignatureError:
+            status = "TOKEN_EXPIRED"
+            logging.error("Token is expired, please renew your credentials")
 
         except jwt.InvalidTokenError:
             logging.error("Invalid token. Access denied.")
             status = "INVALID_TOKEN"
 
-        return status
+        return status, claims
+
+    def invalidate_token(self, token: str) -> None:
+        """Drop a replaced token from the verified token cache."""
+        if self.token_cache is not None:
+            self.token_cache.invalidate(self._token_key(token))
+
+    @staticmethod
+    def _token_key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
 
     def hash_password(self, password: str) -> str:
-        logging.info("Hashing password...")
+        logging.debug("Hashing password...")
         password_with_key = f"{password}{self.encrypt_key}"
 
-        hashed_password = bcrypt.hashpw(password_with_key.encode("utf-8"), self.salt)
-        logging.info("Hashin password completed !")
-        return hashed_password.decode("utf-8")
+        with time_stage("authenticator", "hash_password"):
+            hashed_password = self.hasher.hash(password_with_key.encode("utf-8"))
+        logging.debug("Hashin password completed !")
+        return hashed_password
 
     def verify_password(self, password: str, hashed_password: str) -> bool:
 
         try:
-            logging.info("Verifying password...")
+            logging.debug("Verifying password...")
             password_with_key = f"{password}{self.encrypt_key}"
-            return bcrypt.checkpw(
-                password_with_key.encode("utf-8"), hashed_password.encode("utf-8")
-            )
-            logging.info("Verified password successfully")
+            with time_stage("authenticator", "verify_password"):
+                return self._verifier(hashed_password).verify(
+                    password_with_key.encode("utf-8"), hashed_password
+                )
+            logging.debug("Verified password successfully")
         except Exception as err:
-            logging.error(f"Error verifying password: {err}")
+            logging.error("Error verifying password: %s", err)
             raise Exception
 
+    async def hash_password_async(self, password: str) -> str:
+        logging.debug("Hashing password...")
+        password_with_key = f"{password}{self.encrypt_key}"
+        hashed_password = await self._run_cpu(
+            "hash_password", self.hasher.hash, password_with_key.encode("utf-8")
+        )
+        logging.debug("Hashin password completed !")
+        return hashed_password
+
+    async def hash_passwords_async(self, passwords: List[str]) -> List[str]:
+        """Hash many passwords in small executor jobs, a few jobs at a time.
+
+        Every bulk request shares the `bulk_hash_jobs` slots, so other work on
+        the executor queues behind at most that many short jobs.
+        """
+        logging.debug("Hashing %s passwords...", len(passwords))
+        encoded = [
+            f"{password}{self.encrypt_key}".encode("utf-8") for password in passwords
+        ]
+        bulk_slots = self._bulk_hash_slots()
+
+        async def hash_chunk(chunk: List[bytes]) -> List[str]:
+            async with bulk_slots:
+                return await self._run_cpu(
+                    "hash_passwords_bulk", _hash_many, self.hasher, chunk
+                )
+
+        chunk_size = self.bulk_hash_chunk_size
+        chunks = await asyncio.gather(
+            *(
+                hash_chunk(encoded[start : start + chunk_size])
+                for start in range(0, len(encoded), chunk_size)
+            )
+        )
+        logging.debug("Hashin passwords completed !")
+        return [hashed for chunk in chunks for hashed in chunk]
+
+    def _bulk_hash_slots(self) -> asyncio.Semaphore:
+        # created on first use, inside the loop that serves the requests
+        if self._bulk_slots is None:
+            self._bulk_slots = asyncio.Semaphore(self.bulk_hash_jobs)
+        return self._bulk_slots
+
+    async def verify_password_async(self, password: str, hashed_password: str) -> bool:
+        logging.debug("Verifying password...")
+        password_with_key = f"{password}{self.encrypt_key}"
+        return await self._run_cpu(
+            "verify_password",
+            self._verifier(hashed_password).verify,
+            password_with_key.encode("utf-8"),
+            hashed_password,
+        )
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Tell whether a stored hash predates the configured hasher and params.
+
+        That is a hash made with the shared legacy salt, by another algorithm
+        or with other cost parameters.
+        """
+        if self.legacy_salt is not None and hashed_password.startswith(
+            self.legacy_salt
+        ):
+            return True
+        if identify_hasher(hashed_password) is not type(self.hasher):
+            return True
+        return self.hasher.needs_rehash(hashed_password)
+
+    def _verifier(self, hashed_password: str) -> PasswordHasher:
+        return self._verifiers[identify_hasher(hashed_password).algorithm]
+
+    async def _run_cpu(self, stage: str, func, *args):
+        """Await `func` on the CPU executor, or the loop's default pool without one.
+
+        The job times itself, so `stage` records the work alone; the rest of
+        the wait (queueing behind other jobs, hand-off back to the loop) is
+        recorded as the executor's queue_wait stage.
+        """
+        submitted = time.perf_counter()
+        if self.executor is not None:
+            result, ran = await self.executor.run(_timed, func, *args)
+        else:
+            result, ran = await asyncio.get_running_loop().run_in_executor(
+                None, _timed, func, *args
+            )
+        waited = time.perf_counter() - submitted - ran
+        metrics.observe(STAGE_SECONDS, ran, "authenticator", stage)
+        metrics.observe(STAGE_SECONDS, max(waited, 0.0), "cpu_executor", "queue_wait")
+        return result
+
 
 if __name__ == "__main__":
     import os
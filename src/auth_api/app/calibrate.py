@@ -0,0 +1,108 @@
+"""Recommend password hasher parameters for a target latency on this machine.
+
+    python -m auth_api.app.calibrate --target-ms 50
+    python -m auth_api.app.calibrate --algorithm argon2id --target-ms 100
+
+Each candidate is timed in a single thread; the strongest setting whose median hash
+time stays within the target is printed as an AUTH_CONFIG snippet.
+"""
+
+import argparse
+import statistics
+import time
+from typing import Dict, Iterator, Tuple
+
+from auth_api.app.hashers import HASHERS, build_hasher
+
+PASSWORD = b"calibration-password"
+MIN_ARGON2_MEMORY = 8192  # KiB
+
+
+def measure(algorithm: str, params: Dict[str, int], samples: int) -> float:
+    """Median seconds per hash with the given parameters."""
+    hasher = build_hasher(algorithm, params)
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash(PASSWORD)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def candidates(algorithm: str, memory_kib: int, parallelism: int) -> Iterator[dict]:
+    """Parameter sets of increasing cost for `algorithm`."""
+    if algorithm == "bcrypt":
+        for rounds in range(4, 32):
+            yield {"rounds": rounds}
+    elif algorithm == "scrypt":
+        for ln in range(10, 24):
+            yield {"ln": ln, "r": 8, "p": 1}
+    else:
+        for time_cost in range(1, 64):
+            yield {
+                "time_cost": time_cost,
+                "memory_cost": memory_kib,
+                "parallelism": parallelism,
+            }
+
+
+def calibrate(
+    algorithm: str,
+    target_seconds: float,
+    samples: int = 5,
+    memory_kib: int = 65536,
+    parallelism: int = 4,
+) -> Tuple[dict, float]:
+    """Strongest parameters hashing within `target_seconds`, with their timing.
+
+    Costs grow monotonically, so the search stops at the first candidate over
+    the target. When even the cheapest one is too slow, argon2id retries with
+    half the memory (down to 8 MiB) and the others return that candidate.
+    """
+    best = None
+    for params in candidates(algorithm, memory_kib, parallelism):
+        elapsed = measure(algorithm, params, samples)
+        if elapsed > target_seconds:
+            break
+        best = (params, elapsed)
+    if best is None and algorithm == "argon2id" and memory_kib > MIN_ARGON2_MEMORY:
+        return calibrate(
+            algorithm, target_seconds, samples, memory_kib // 2, parallelism
+        )
+    return best or (params, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--algorithm", choices=sorted(HASHERS), default=None)
+    parser.add_argument("--target-ms", type=float, default=50.0)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument(
+        "--memory-kib", type=int, default=65536, help="argon2id memory cost"
+    )
+    parser.add_argument(
+        "--parallelism", type=int, default=4, help="argon2id lanes per hash"
+    )
+    args = parser.parse_args()
+
+    algorithms = [args.algorithm] if args.algorithm else sorted(HASHERS)
+    for algorithm in algorithms:
+        params, elapsed = calibrate(
+            algorithm,
+            args.target_ms / 1000,
+            args.samples,
+            args.memory_kib,
+            args.parallelism,
+        )
+        print(
+            f"# {algorithm}: {elapsed * 1000:.1f} ms per hash, "
+            f"~{1 / elapsed:.0f} hashes/s per executor worker"
+        )
+        print(f'password_hasher: "{algorithm}"')
+        print(f"hasher_params: {params}\n".replace("'", ""))
+
+
+if __name__ == "__main__":
+    main()
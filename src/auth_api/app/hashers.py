@@ -0,0 +1,190 @@
+import base64
+import hashlib
+import hmac
+import os
+from abc import ABC, abstractmethod
+from typing import Dict
+
+import argon2
+import bcrypt
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+
+class PasswordHasher(ABC):
+    """Hashes passwords into self-describing strings.
+
+    The algorithm and its cost parameters are encoded in every hash, so a hash
+    made with older or different settings can still be verified and is
+    reported by `needs_rehash` for an upgrade on the next login.
+    """
+
+    algorithm = ""
+    prefix = ""
+
+    @abstractmethod
+    def hash(self, password: bytes) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def verify(self, password: bytes, encoded: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def needs_rehash(self, encoded: str) -> bool:
+        raise NotImplementedError
+
+    @property
+    @abstractmethod
+    def params(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+
+class BcryptHasher(PasswordHasher):
+    algorithm = "bcrypt"
+    prefix = "$2"
+
+    def __init__(self, rounds: int = 12):
+        self.rounds = rounds
+
+    def hash(self, password: bytes) -> str:
+        return bcrypt.hashpw(password, bcrypt.gensalt(rounds=self.rounds)).decode(
+            "utf-8"
+        )
+
+    def verify(self, password: bytes, encoded: str) -> bool:
+        return bcrypt.checkpw(password, encoded.encode("utf-8"))
+
+    def needs_rehash(self, encoded: str) -> bool:
+        # $2b$<rounds>$<salt and hash>
+        return int(encoded.split("$")[2]) != self.rounds
+
+    @property
+    def params(self) -> Dict[str, int]:
+        return {"rounds": self.rounds}
+
+
+class ScryptHasher(PasswordHasher):
+    """hashlib.scrypt, stored as $scrypt$ln=<log2 n>,r=<r>,p=<p>$<salt>$<hash>."""
+
+    algorithm = "scrypt"
+    prefix = "$scrypt$"
+
+    def __init__(self, ln: int = 15, r: int = 8, p: int = 1, salt_size: int = 16):
+        self.ln = ln
+        self.r = r
+        self.p = p
+        self.salt_size = salt_size
+
+    def _derive(self, password: bytes, salt: bytes, ln: int, r: int, p: int) -> bytes:
+        n = 1 << ln
+        return hashlib.scrypt(
+            password,
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r + 1024 * 1024,
+            dklen=32,
+        )
+
+    @staticmethod
+    def _parse(encoded: str) -> tuple:
+        _, _, params, salt, digest = encoded.split("$")
+        values = dict(item.split("=") for item in params.split(","))
+        return (
+            int(values["ln"]),
+            int(values["r"]),
+            int(values["p"]),
+            _b64decode(salt),
+            _b64decode(digest),
+        )
+
+    def hash(self, password: bytes) -> str:
+        salt = os.urandom(self.salt_size)
+        digest = self._derive(password, salt, self.ln, self.r, self.p)
+        return (
+            f"{self.prefix}ln={self.ln},r={self.r},p={self.p}"
+            f"${_b64encode(salt)}${_b64encode(digest)}"
+        )
+
+    def verify(self, password: bytes, encoded: str) -> bool:
+        ln, r, p, salt, digest = self._parse(encoded)
+        return hmac.compare_digest(self._derive(password, salt, ln, r, p), digest)
+
+    def needs_rehash(self, encoded: str) -> bool:
+        ln, r, p, _, _ = self._parse(encoded)
+        return (ln, r, p) != (self.ln, self.r, self.p)
+
+    @property
+    def params(self) -> Dict[str, int]:
+        return {"ln": self.ln, "r": self.r, "p": self.p}
+
+
+class Argon2Hasher(PasswordHasher):
+    """Argon2id through argon2-cffi, in the standard PHC string format."""
+
+    algorithm = "argon2id"
+    prefix = "$argon2id$"
+
+    def __init__(
+        self, time_cost: int = 3, memory_cost: int = 65536, parallelism: int = 4
+    ):
+        self.time_cost = time_cost
+        self.memory_cost = memory_cost  # KiB
+        self.parallelism = parallelism
+        self._hasher = argon2.PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+            type=argon2.Type.ID,
+        )
+
+    def hash(self, password: bytes) -> str:
+        return self._hasher.hash(password)
+
+    def verify(self, password: bytes, encoded: str) -> bool:
+        try:
+            return self._hasher.verify(encoded, password)
+        except argon2.exceptions.VerifyMismatchError:
+            return False
+
+    def needs_rehash(self, encoded: str) -> bool:
+        return self._hasher.check_needs_rehash(encoded)
+
+    @property
+    def params(self) -> Dict[str, int]:
+        return {
+            "time_cost": self.time_cost,
+            "memory_cost": self.memory_cost,
+            "parallelism": self.parallelism,
+        }
+
+
+HASHERS = {
+    BcryptHasher.algorithm: BcryptHasher,
+    ScryptHasher.algorithm: ScryptHasher,
+    Argon2Hasher.algorithm: Argon2Hasher,
+}
+
+
+def build_hasher(algorithm: str, params: Dict[str, int]) -> PasswordHasher:
+    if algorithm not in HASHERS:
+        raise ValueError(
+            f"Unknown password hasher '{algorithm}', use one of {sorted(HASHERS)}"
+        )
+    return HASHERS[algorithm](**params)
+
+
+def identify_hasher(encoded: str) -> type:
+    """Find the hasher class a stored hash was made with."""
+    for hasher_class in HASHERS.values():
+        if encoded.startswith(hasher_class.prefix):
+            return hasher_class
+    raise ValueError("Unrecognised password hash format")
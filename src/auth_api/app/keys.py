@@ -0,0 +1,121 @@
+import argparse
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+from auth_api.app.models import SigningKeyConfig
+
+ALGORITHMS = {"RS256": RSAAlgorithm, "EdDSA": OKPAlgorithm}
+
+
+class SigningKey:
+    """One asymmetric key pair, loaded once so PEM parsing stays off the hot path."""
+
+    def __init__(self, configs: SigningKeyConfig):
+        if configs.algorithm not in ALGORITHMS:
+            raise ValueError(
+                f"Unsupported signing algorithm '{configs.algorithm}', "
+                f"use one of {sorted(ALGORITHMS)}"
+            )
+        self.kid = configs.kid
+        self.algorithm = configs.algorithm
+        self.private_key = None
+        if configs.private_key_path:
+            with open(configs.private_key_path, "rb") as file:
+                self.private_key = serialization.load_pem_private_key(
+                    file.read(), password=None
+                )
+            self.public_key = self.private_key.public_key()
+        elif configs.public_key_path:
+            with open(configs.public_key_path, "rb") as file:
+                self.public_key = serialization.load_pem_public_key(file.read())
+        else:
+            raise ValueError(f"Signing key '{self.kid}' has no key file configured")
+
+    def jwk(self) -> dict:
+        jwk = ALGORITHMS[self.algorithm].to_jwk(self.public_key, as_dict=True)
+        return {**jwk, "kid": self.kid, "use": "sig", "alg": self.algorithm}
+
+
+class KeyRing:
+    """Signing keys indexed by key id (kid).
+
+    The active key signs new tokens. The other keys only verify, which keeps
+    tokens signed before a rotation valid until they expire. Keys listed
+    with just a public key are verify only too.
+    """
+
+    def __init__(self, keys: List[SigningKeyConfig], active_kid: Optional[str]):
+        self.keys: Dict[str, SigningKey] = {
+            configs.kid: SigningKey(configs) for configs in keys
+        }
+        if active_kid not in self.keys:
+            raise ValueError(f"Active signing key '{active_kid}' is not configured")
+        self.active = self.keys[active_kid]
+        if self.active.private_key is None:
+            raise ValueError(f"Active signing key '{active_kid}' has no private key")
+        logging.info(
+            "Loaded %s signing keys, signing with '%s'.", len(self.keys), active_kid
+        )
+
+    def get(self, kid: str) -> Optional[SigningKey]:
+        return self.keys.get(kid)
+
+    def jwks(self) -> dict:
+        """Public keys in JSON Web Key Set format."""
+        return {"keys": [key.jwk() for key in self.keys.values()]}
+
+
+def generate_key_pair(algorithm: str, kid: str, directory: str) -> SigningKeyConfig:
+    """Write a new PEM key pair to `directory`, ready to be added to the ring."""
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        raise ValueError(f"Unsupported signing algorithm '{algorithm}'")
+
+    os.makedirs(directory, exist_ok=True)
+    private_key_path = os.path.join(directory, f"{kid}.pem")
+    public_key_path = os.path.join(directory, f"{kid}.pub.pem")
+    with open(
+        os.open(private_key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb"
+    ) as file:
+        file.write(
+            private_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    with open(public_key_path, "wb") as file:
+        file.write(
+            private_key.public_key().public_bytes(
+                serialization.Encoding.PEM,
+                serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+        )
+    return SigningKeyConfig(
+        kid=kid,
+        algorithm=algorithm,
+        private_key_path=private_key_path,
+        public_key_path=public_key_path,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate a signing key pair for AUTH_CONFIG.signing_keys."
+    )
+    parser.add_argument("--kid", required=True)
+    parser.add_argument("--algorithm", choices=sorted(ALGORITHMS), default="EdDSA")
+    parser.add_argument("--directory", default="keys")
+    args = parser.parse_args()
+
+    key_config = generate_key_pair(args.algorithm, args.kid, args.directory)
+    print(json.dumps(key_config.model_dump(), indent=2))
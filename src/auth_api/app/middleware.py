@@ -0,0 +1,100 @@
+import logging
+import time
+
+from starlette.routing import Match, Route
+
+from auth_api.utils.logs import reset_sampling, sample_request
+from auth_api.utils.metrics import REQUEST_SECONDS, metrics
+
+
+class LabelledRoute(Route):
+    """Starlette route that puts itself in scope["route"], as FastAPI's APIRoute does.
+
+    The middlewares below label requests by that route's path; without it a
+    plain route is reported as "unmatched", like a 404.
+    """
+
+    def matches(self, scope):
+        match, child_scope = super().matches(scope)
+        if match != Match.NONE:
+            child_scope["route"] = self
+        return match, child_scope
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware recording the total duration of every request.
+
+    Requests are labelled by route template, not raw path, to keep the metric
+    cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            metrics.observe(
+                REQUEST_SECONDS,
+                time.perf_counter() - start,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status_code),
+            )
+
+
+class RequestLoggingMiddleware:
+    """Pure ASGI middleware sampling DEBUG lines per request.
+
+    Each request is kept or dropped as a whole, so sampled requests still log
+    every step. With `summary` on, one key=value line per request is written
+    at INFO level.
+    """
+
+    def __init__(self, app, debug_sample_rate: float = 1.0, summary: bool = True):
+        self.app = app
+        self.debug_sample_rate = debug_sample_rate
+        self.summary = summary
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        token = sample_request(self.debug_sample_rate)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            if self.summary:
+                route = scope.get("route")
+                logging.info(
+                    "request method=%s path=%s route=%s status=%s duration_ms=%.2f",
+                    scope["method"],
+                    scope["path"],
+                    route.path if route is not None else "unmatched",
+                    status_code,
+                    (time.perf_counter() - start) * 1000,
+                )
+            reset_sampling(token)
@@ -1,15 +1,109 @@
 from datetime import datetime
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
 
 # Auth models
+class SigningKeyConfig(BaseModel):
+    kid: str
+    algorithm: str = "EdDSA"  # RS256 or EdDSA
+    private_key_path: Optional[str] = None
+    public_key_path: Optional[str] = None  # enough for keys that only verify
+
+
 class AuthConfig(BaseModel):
     secret_key: str
     expire_delta: int
     algorithm: str
     encrypt_key: str
-    salt: bytes
+    salt: Optional[bytes] = None  # legacy global salt, only used to spot old hashes
+    password_hasher: str = "bcrypt"  # bcrypt, scrypt or argon2id
+    hasher_params: Dict[str, int] = {}
+    token_cache_size: int = 0
+    token_version: int = 1  # 2 issues compact tokens with exp/iat/sub claims
+    token_leeway: int = 0  # seconds of clock skew tolerated on expiry
+    accept_v1_tokens: bool = True  # keep during the migration window
+    access_token_ttl: int = 900  # seconds
+    refresh_token_ttl: int = 1209600  # seconds, 14 days
+    signing_keys: List[SigningKeyConfig] = []
+    active_kid: Optional[str] = None
+    jwks_max_age: int = 300  # seconds downstream services may cache the JWKS
+    bulk_hash_chunk_size: int = 4  # passwords per executor job in bulk signup
+    bulk_hash_jobs: Optional[int] = None  # bulk jobs on the executor at once
+
+
+class ExecutorConfig(BaseModel):
+    kind: str = "thread"
+    max_workers: Optional[int] = None
+    max_queue: int = 64
+    retry_after: int = 1
+
+
+class BulkSignupConfig(BaseModel):
+    chunk_size: int = 500
+    max_items: int = 10000
+
+
+class VerifyBatchConfig(BaseModel):
+    max_batch_size: int = 256
+
+
+class UserCacheConfig(BaseModel):
+    enabled: bool = False
+    max_size: int = 10000
+    ttl: float = 30  # seconds
+
+
+class SingleFlightConfig(BaseModel):
+    enabled: bool = False
+
+
+class FastLoginConfig(BaseModel):
+    enabled: bool = False
+
+
+class RateLimitConfig(BaseModel):
+    enabled: bool = False
+    ip_rate: float = 5  # tokens per second
+    ip_burst: int = 20
+    user_rate: float = 0.2
+    user_burst: int = 5
+    max_keys: int = 100000  # buckets kept per limiter
+
+
+class LoginEventsConfig(BaseModel):
+    enabled: bool = False
+    flush_interval: float = 1.0  # seconds between bulk writes
+    batch_size: int = 500  # pending users that trigger an early flush
+    max_pending: int = 10000  # users held between flushes, more are dropped
+
+
+class MetricsConfig(BaseModel):
+    enabled: bool = False
+
+
+class AppLoggingConfig(BaseModel):
+    mode: str = "sync"
+    level: str = "INFO"
+    debug_sample_rate: float = 1.0
+    request_summary: bool = False
+
+
+class ServerConfig(BaseModel):
+    # API_CONFIGS keys, upper case like the rest of that section
+    HOST: str  # bind address, only set in the YAML
+    PORT: int = 8090
+    LOG_LEVEL: str = "info"
+    WORKERS: int = 1
+    LOOP: str = "auto"  # auto, asyncio or uvloop
+    HTTP: str = "auto"  # auto, h11 or httptools
+    BACKLOG: int = 2048
+    KEEP_ALIVE: int = 5  # seconds an idle connection is kept open
+    GRACEFUL_SHUTDOWN: int = 30  # seconds in-flight requests get to drain
+    MAX_REQUESTS: Optional[int] = None  # recycle a worker after this many
+    # proxies trusted for X-Forwarded-For, None: uvicorn's default (127.0.0.1)
+    FORWARDED_ALLOW_IPS: Optional[str] = None
 
 
 class RegisterPayload(BaseModel):
@@ -36,6 +130,10 @@ class RegisterRequest(BaseModel):
     role: str
 
 
+class BulkRegisterRequest(BaseModel):
+    users: List[RegisterRequest]
+
+
 class LoginRequest(BaseModel):
     app_name: str
     user_name: str
@@ -47,3 +145,12 @@ class RenewCredentialsRequest(BaseModel):
     user_name: str
     old_password: str
     new_password: str
+
+
+class RefreshTokenRequest(BaseModel):
+    app_name: str
+    refresh_token: str
+
+
+class VerifyBatchRequest(BaseModel):
+    tokens: List[str]
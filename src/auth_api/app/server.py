@@ -0,0 +1,63 @@
+"""Production entry point: uvicorn with worker processes, tuned from API_CONFIGS.
+
+    python -m auth_api.app.server --config app_configs.yaml
+
+Every worker builds its own app through create_app, so the Mongo client and
+CPU executor are opened after the fork. The supervisor restarts workers that
+exit, including the ones recycled after MAX_REQUESTS; with a single worker
+there is no supervisor and the process itself exits, for the container or
+process manager to restart.
+"""
+
+import argparse
+import os
+from typing import Optional
+
+from auth_api.app.models import ServerConfig
+from auth_api.utils.tools import read_yaml
+
+APP_FACTORY = "auth_api.app.api:create_app"
+
+
+def uvicorn_options(server_config: ServerConfig) -> dict:
+    return {
+        "host": server_config.HOST,
+        "port": server_config.PORT,
+        "log_level": server_config.LOG_LEVEL.lower(),
+        "workers": server_config.WORKERS,
+        # "auto" picks uvloop and httptools when they are installed
+        "loop": server_config.LOOP,
+        "http": server_config.HTTP,
+        "backlog": server_config.BACKLOG,
+        "timeout_keep_alive": server_config.KEEP_ALIVE,
+        # on SIGTERM stop accepting, then give in-flight requests this long
+        "timeout_graceful_shutdown": server_config.GRACEFUL_SHUTDOWN,
+        "limit_max_requests": server_config.MAX_REQUESTS,
+        # the client address (and so the per-IP rate limit) is read from
+        # X-Forwarded-For on requests coming from these proxies
+        "proxy_headers": True,
+        "forwarded_allow_ips": server_config.FORWARDED_ALLOW_IPS,
+    }
+
+
+def serve(config_path: Optional[str] = None) -> None:
+    """Run the API as configured by `config_path`, AUTH_API_CONFIG by default."""
+    import uvicorn
+
+    if config_path is not None:
+        # workers load their configuration on their own, through the env
+        os.environ["AUTH_API_CONFIG"] = config_path
+    configs = read_yaml(os.getenv("AUTH_API_CONFIG", "app_configs.yaml"))
+    uvicorn.run(
+        APP_FACTORY,
+        factory=True,
+        log_config=configs.get("LOGGING_CONFIG"),
+        **uvicorn_options(ServerConfig(**configs.get("API_CONFIGS", {}))),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the auth API.")
+    parser.add_argument("--config", help="defaults to AUTH_API_CONFIG")
+    args = parser.parse_args()
+    serve(args.config)
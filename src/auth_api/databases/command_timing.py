@@ -0,0 +1,35 @@
+from pymongo import monitoring
+
+from auth_api.utils.metrics import STAGE_SECONDS, metrics
+
+STAGE_COMPONENT = "mongo_command"
+
+
+class CommandTimingListener(monitoring.CommandListener):
+    """Records how long each command took, as measured by the driver.
+
+    The duration covers sending the command and reading the reply on a
+    checked out connection: no waiting for a pooled connection (see
+    PoolStatsListener) and, with the async driver, no time spent by other
+    coroutines before the awaiting one resumes. Stages are the command names,
+    e.g. find, insert, update, findAndModify.
+    """
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        metrics.observe(
+            STAGE_SECONDS,
+            event.duration_micros / 1e6,
+            STAGE_COMPONENT,
+            event.command_name,
+        )
+
+    def failed(self, event) -> None:
+        metrics.observe(
+            STAGE_SECONDS,
+            event.duration_micros / 1e6,
+            STAGE_COMPONENT,
+            event.command_name,
+        )
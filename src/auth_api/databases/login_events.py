@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+# (app_name, user_name) -> [logins, failed logins, last login, last failed login]
+PendingEvents = Dict[Tuple[str, str], list]
+
+
+class LoginEventRecorder:
+    """Batches login analytics (last_login_at, login counters) off the login path.
+
+    `record` only updates an in-memory entry per user, so a burst of logins
+    of one account turns into a single update. A background task flushes the
+    pending entries every `flush_interval` seconds, or as soon as
+    `batch_size` users are pending, as one unordered bulk write per app
+    collection. At most `max_pending` users are held; events of further
+    users are dropped (and counted) until the next flush. A batch that fails
+    to be written is merged back for the next flush. `stop` lets a running
+    flush finish and flushes whatever is left.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[str, List[tuple]], Awaitable[None]],
+        flush_interval: float = 1.0,
+        batch_size: int = 500,
+        max_pending: int = 10000,
+    ):
+        self._write = write
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending: PendingEvents = {}
+        self._batch_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.recorded = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.flush_errors = 0
+
+    def record(self, app_name: str, user_name: str, success: bool) -> None:
+        """Note one login attempt; never blocks and never touches the database."""
+        key = (app_name, user_name)
+        entry = self._pending.get(key)
+        if entry is None:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            entry = self._pending[key] = [0, 0, None, None]
+            if len(self._pending) >= self.batch_size:
+                self._batch_ready.set()
+        now = datetime.now(timezone.utc)
+        if success:
+            entry[0] += 1
+            entry[2] = now
+        else:
+            entry[1] += 1
+            entry[3] = now
+        self.recorded += 1
+
+    @staticmethod
+    def _update(entry: list) -> dict:
+        logins, failures, last_login_at, last_failed_at = entry
+        increments, latest = {}, {}
+        if logins:
+            increments["login_count"] = logins
+            latest["last_login_at"] = last_login_at
+        if failures:
+            increments["failed_login_count"] = failures
+            latest["last_failed_login_at"] = last_failed_at
+        # $max keeps the newest time if flushes from two workers interleave;
+        # operators are left out when empty, which MongoDB < 5.0 rejects
+        update = {}
+        if increments:
+            update["$inc"] = increments
+        if latest:
+            update["$max"] = latest
+        return update
+
+    def _restore(self, held: PendingEvents) -> None:
+        """Merge the entries of a failed write into the ones recorded since."""
+        for key, (logins, failures, last_login_at, last_failed_at) in held.items():
+            entry = self._pending.get(key)
+            if entry is None:
+                if len(self._pending) >= self.max_pending:
+                    self.dropped += logins + failures
+                    continue
+                entry = self._pending[key] = [0, 0, None, None]
+            entry[0] += logins
+            entry[1] += failures
+            entry[2] = max(filter(None, (entry[2], last_login_at)), default=None)
+            entry[3] = max(filter(None, (entry[3], last_failed_at)), default=None)
+
+    async def flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        self._batch_ready.clear()
+        if not pending:
+            return
+        by_app: Dict[str, PendingEvents] = {}
+        for key, entry in pending.items():
+            by_app.setdefault(key[0], {})[key] = entry
+        for app_name, held in by_app.items():
+            updates = [
+                ({"user_name": user_name}, self._update(entry))
+                for (_, user_name), entry in held.items()
+            ]
+            try:
+                await self._write(app_name, updates)
+                self.flushed += len(updates)
+            except Exception as err:
+                self.flush_errors += 1
+                logging.error(
+                    "Failed to record %s login events on '%s': %s",
+                    len(updates),
+                    app_name,
+                    err,
+                )
+                self._restore(held)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    def start(self) -> None:
+        self._stopping = False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        # no cancel: it would kill a write in progress, whose entries are
+        # already out of the pending map, so the flush task is woken to exit
+        if self._task is not None:
+            self._stopping = True
+            self._batch_ready.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._pending:
+            unwritten = sum(entry[0] + entry[1] for entry in self._pending.values())
+            self.dropped += unwritten
+            self._pending = {}
+            logging.error("Dropped %s login events left unwritten.", unwritten)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "flushed": self.flushed,
+            "flush_errors": self.flush_errors,
+            "pending": len(self._pending),
+        }
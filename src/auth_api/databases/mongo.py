@@ -1,44 +1,258 @@
 import logging
+from typing import List, Optional, Set
 
-from pymongo import MongoClient
-from pymongo.errors import PyMongoError
+from pymongo import (
+    ASCENDING,
+    IndexModel,
+    MongoClient,
+    ReadPreference,
+    UpdateOne,
+    WriteConcern,
+)
+from pymongo.errors import (
+    BulkWriteError,
+    CollectionInvalid,
+    OperationFailure,
+    PyMongoError,
+)
+
+from auth_api.databases.command_timing import CommandTimingListener
+from auth_api.databases.pool_stats import PoolStatsListener
+from auth_api.databases.registry import CollectionRegistry
+from auth_api.utils.metrics import metrics, time_stage
+
+DUPLICATE_KEY = 11000
+NAMESPACE_EXISTS = 48
+
+# One document per user in every app collection, unique by name and by id.
+USER_INDEXES = [
+    IndexModel(
+        [("user_name", ASCENDING)], name="user_name_unique", unique=True, sparse=True
+    ),
+    IndexModel(
+        [("user_id", ASCENDING)], name="user_id_unique", unique=True, sparse=True
+    ),
+]
+# Refresh tokens live next to the users, without user_name/user_id fields (hence
+# the sparse user indexes). Mongo's TTL monitor drops them once expired.
+REFRESH_TOKEN_INDEXES = [
+    IndexModel(
+        [("refresh_token", ASCENDING)],
+        name="refresh_token_unique",
+        unique=True,
+        sparse=True,
+    ),
+    IndexModel(
+        [("expires_at", ASCENDING)], name="refresh_token_ttl", expireAfterSeconds=0
+    ),
+    # a password change revokes every refresh token of its owner
+    IndexModel([("owner_name", ASCENDING)], name="refresh_token_owner", sparse=True),
+]
+
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+def database_views(
+    client, database_name: str, read_preference: str, write_concern: Optional[dict]
+):
+    """Database handles for user lookups and for inserts, with their own options.
+
+    Lookups may go to secondaries, which can briefly miss a user that just
+    signed up; inserts (signups) may ask for a stronger write concern.
+    """
+    if read_preference not in READ_PREFERENCES:
+        raise ValueError(
+            f"Unknown read preference '{read_preference}', "
+            f"use one of {sorted(READ_PREFERENCES)}"
+        )
+    lookup_db = client.get_database(
+        database_name, read_preference=READ_PREFERENCES[read_preference]
+    )
+    insert_db = client.get_database(
+        database_name,
+        write_concern=WriteConcern(**write_concern) if write_concern else None,
+    )
+    return lookup_db, insert_db
+
+
+def duplicated_key(error_details: dict) -> str:
+    """Return the field a duplicate key write error collided on, if known."""
+    key_pattern = error_details.get("keyPattern")
+    if key_pattern:
+        return next(iter(key_pattern))
+    error_message = error_details.get("errmsg", "")
+    for index in USER_INDEXES:
+        if index.document["name"] in error_message:
+            return next(iter(index.document["key"]))
+    return ""
+
+
+class MissingUniqueIndexError(Exception):
+    """A signup into a collection whose unique indexes could not be built.
+
+    Inserts rely on those indexes to reject duplicated user names and ids, so
+    such a collection takes no signups until it is cleaned up and the server
+    restarted (see ensure_indexes).
+    """
+
+    def __init__(self, collection_name: str):
+        super().__init__(
+            f"Collection '{collection_name}' is missing its unique indexes"
+        )
+        self.collection_name = collection_name
+
+
+def driver_listeners(pool_stats: PoolStatsListener) -> list:
+    """Event listeners for a new client, command timing only with metrics on.
+
+    The driver builds started/succeeded/failed events for every command as
+    long as a command listener is registered, so none is while disabled.
+    """
+    listeners = [pool_stats]
+    if metrics.enabled:
+        listeners.append(CommandTimingListener())
+    return listeners
+
+
+def log_duplicates(collection_name: str, index: IndexModel, err) -> None:
+    """Tell which unique index could not be built over existing duplicates."""
+    logging.error(
+        "Skipped index '%s' on '%s' collection, it holds duplicate '%s' values: "
+        "%s. Remove the duplicated documents and restart to build it.",
+        index.document["name"],
+        collection_name,
+        next(iter(index.document["key"])),
+        err,
+    )
 
 
 class MongoHandler:
-    def __init__(self, connection_string, database_name):
+    def __init__(
+        self,
+        connection_string,
+        database_name,
+        collection_registry_ttl: Optional[float] = None,
+        client_options: Optional[dict] = None,
+        read_preference: str = "primary",
+        write_concern: Optional[dict] = None,
+    ):
+        """`client_options` are passed to the driver client as is, e.g.
+        maxPoolSize or serverSelectionTimeoutMS; `read_preference` applies to
+        user lookups and `write_concern` (w, j, wtimeout) to inserts.
+        """
         try:
-            self.client = MongoClient(connection_string)
+            self.pool_stats = PoolStatsListener()
+            self.client = MongoClient(
+                connection_string,
+                event_listeners=driver_listeners(self.pool_stats),
+                **(client_options or {}),
+            )
             self.db = self.client[database_name]
-            logging.info(f"Connected to mongoDB on {database_name} database.")
+            self.lookup_db, self.insert_db = database_views(
+                self.client, database_name, read_preference, write_concern
+            )
+            self.collections = CollectionRegistry(ttl=collection_registry_ttl)
+            # collections whose unique indexes failed to build at warm-up
+            self.incomplete_collections: Set[str] = set()
+            logging.info("Connected to mongoDB on %s database.", database_name)
         except PyMongoError as err:
-            logging.error(f"Failed to connect to MongoDB: {err}")
+            logging.error("Failed to connect to MongoDB: %s", err)
             raise err
 
-    def get_document(self, collection_name: str, filter_query: dict) -> dict:
-        """Retrieve a document matching the filter query."""
+    def close(self) -> None:
+        self.client.close()
+        logging.info("Closed mongoDB connections.")
+
+    def ping(self) -> None:
+        """Round trip to the server, raises when it cannot be reached."""
+        with time_stage("mongo", "ping"):
+            self.client.admin.command("ping")
+
+    def get_document(
+        self,
+        collection_name: str,
+        filter_query: dict,
+        projection: Optional[dict] = None,
+    ) -> Optional[dict]:
+        """Retrieve a document matching the filter query, limited to `projection`."""
         try:
-            logging.info("getting a document...")
-            collection = self.db[collection_name]
-            document = collection.find_one(filter_query)
-            logging.info(f"Got the document: {document}")
+            logging.debug("getting a document...")
+            collection = self.lookup_db[collection_name]
+            with time_stage("mongo", "find_one"):
+                document = collection.find_one(filter_query, projection)
+            logging.debug("Got a document from %s collection.", collection_name)
             return document
         except Exception as err:
             logging.error(
-                f"Error retrieving document from '{collection_name}' collection: {err}"
+                "Error retrieving document from '%s' collection: %s",
+                collection_name,
+                err,
             )
             raise err
 
     def create(self, collection_name: str, document) -> str:
-        """Insert a new document into the specified collection."""
+        """Insert a new document into the specified collection.
+
+        Meant for signups, so the write waits for the signup write concern.
+        """
         try:
-            logging.info(f"creating collection {collection_name}")
-            collection = self.db[collection_name]
-            result = collection.insert_one(document)
-            logging.info(f"created collection {collection_name}")
+            logging.debug("creating collection %s", collection_name)
+            collection = self.insert_db[collection_name]
+            with time_stage("mongo", "insert_one"):
+                result = collection.insert_one(document)
+            logging.debug("created collection %s", collection_name)
             return result.inserted_id
         except Exception as err:
             logging.error(
-                f"Error creating document in collection '{collection_name}': {err}"
+                "Error creating document in collection '%s': %s", collection_name, err
+            )
+            raise err
+
+    def create_token(self, collection_name: str, document: dict) -> None:
+        """Insert a refresh token with the client's default write concern.
+
+        A token lost to a failover only costs its owner a new login, so it
+        does not wait for the signup write concern.
+        """
+        try:
+            collection = self.db[collection_name]
+            with time_stage("mongo", "insert_token"):
+                collection.insert_one(document)
+        except Exception as err:
+            logging.error(
+                "Error storing refresh token in '%s' collection: %s",
+                collection_name,
+                err,
+            )
+            raise err
+
+    def create_many(self, collection_name: str, documents: list) -> List[dict]:
+        """Insert documents unordered and return the write errors of rejected ones."""
+        try:
+            logging.debug(
+                "inserting %s documents in %s", len(documents), collection_name
+            )
+            collection = self.insert_db[collection_name]
+            with time_stage("mongo", "insert_many"):
+                collection.insert_many(documents, ordered=False)
+            return []
+        except BulkWriteError as err:
+            logging.debug(
+                "%s documents rejected by %s",
+                len(err.details["writeErrors"]),
+                collection_name,
+            )
+            return err.details["writeErrors"]
+        except Exception as err:
+            logging.error(
+                "Error creating documents in collection '%s': %s", collection_name, err
             )
             raise err
 
@@ -47,16 +261,39 @@ class MongoHandler:
     ) -> str:
         """Insert or update a document based on a filter query."""
         try:
-            logging.info("upserting a document...")
+            logging.debug("upserting a document...")
             collection = self.db[collection_name]
-            result = collection.update_one(
-                filter_query, {"$set": update_data}, upsert=True
-            )
-            logging.info("Upserted a document.")
+            with time_stage("mongo", "update_one"):
+                result = collection.update_one(
+                    filter_query, {"$set": update_data}, upsert=True
+                )
+            logging.debug("Upserted a document.")
             return result.upserted_id if result.upserted_id else "Updated"
         except Exception as err:
             logging.error(
-                f"Error upserting document on '{collection_name}' collection: {err}"
+                "Error upserting document on '%s' collection: %s", collection_name, err
+            )
+            raise err
+
+    def bulk_update(self, collection_name: str, updates: List[tuple]) -> int:
+        """Apply (filter, update) pairs in one unordered bulk write.
+
+        Returns how many documents matched; filters matching nothing are skipped.
+        """
+        try:
+            collection = self.db[collection_name]
+            with time_stage("mongo", "bulk_write"):
+                result = collection.bulk_write(
+                    [
+                        UpdateOne(filter_query, update)
+                        for filter_query, update in updates
+                    ],
+                    ordered=False,
+                )
+            return result.matched_count
+        except Exception as err:
+            logging.error(
+                "Error bulk updating '%s' collection: %s", collection_name, err
             )
             raise err
 
@@ -64,26 +301,405 @@ class MongoHandler:
         """Delete documents matching the filter query."""
         try:
             collection = self.db[collection_name]
-            collection.delete_one(filter_query)
+            with time_stage("mongo", "delete_one"):
+                collection.delete_one(filter_query)
         except Exception as err:
-            logging.error(f"Error deleting document: {err}")
+            logging.error("Error deleting document: %s", err)
+            raise err
+
+    def delete_documents(self, collection_name: str, filter_query: dict) -> int:
+        """Delete every document matching the filter query, return how many."""
+        try:
+            collection = self.db[collection_name]
+            with time_stage("mongo", "delete_many"):
+                result = collection.delete_many(filter_query)
+            return result.deleted_count
+        except Exception as err:
+            logging.error(
+                "Error deleting documents from '%s' collection: %s",
+                collection_name,
+                err,
+            )
+            raise err
+
+    def pop_document(self, collection_name: str, filter_query: dict) -> Optional[dict]:
+        """Atomically fetch and delete a document, for single use credentials."""
+        try:
+            collection = self.db[collection_name]
+            with time_stage("mongo", "find_one_and_delete"):
+                return collection.find_one_and_delete(filter_query)
+        except Exception as err:
+            logging.error(
+                "Error popping document from '%s' collection: %s", collection_name, err
+            )
             raise err
 
     def create_collection_if_not_exist(self, collection_name: str) -> None:
+        """Make sure a collection can take signups, creating it when missing."""
+        if collection_name in self.incomplete_collections:
+            raise MissingUniqueIndexError(collection_name)
         try:
-            collections = [el["name"] for el in self.db.list_collections().to_list()]
-            if collection_name not in collections:
-                self.db.create_collection(collection_name)
-                logging.info(f"created collection '{collection_name}' !")
-            else:
-                logging.info(
-                    f"Collection '{collection_name}' already exists, not necessary create it again."
+            if self.collections.lookup(collection_name):
+                return
+
+            # lazy refresh: the collection may have been created by another worker,
+            # or the registry expired. Names only: indexes of existing collections
+            # are ensured at startup (warm_collections), new ones below.
+            with time_stage("mongo", "list_collections"):
+                collection_names = self.db.list_collection_names()
+            self.collections.load(collection_names)
+
+            if collection_name not in collection_names:
+                try:
+                    with time_stage("mongo", "create_collection"):
+                        self.db.create_collection(collection_name, check_exists=False)
+                    logging.info("created collection '%s' !", collection_name)
+                except (CollectionInvalid, OperationFailure) as err:
+                    if getattr(err, "code", NAMESPACE_EXISTS) != NAMESPACE_EXISTS:
+                        raise err
+                    logging.info(
+                        "Collection '%s' already exists, not necessary create it again.",
+                        collection_name,
+                    )
+                self.ensure_indexes(collection_name)
+                self.collections.add(collection_name)
+
+        except Exception as err:
+            logging.error("Error deleting document: %s", err)
+            raise err
+
+    def ensure_indexes(self, collection_name: str) -> bool:
+        """Create the user and refresh token indexes, a no-op if present.
+
+        A unique index cannot be built over duplicates, e.g. users signed up
+        twice before the indexes existed. The other indexes are built then,
+        the failing ones are logged and False is returned.
+        """
+        collection = self.db[collection_name]
+        try:
+            with time_stage("mongo", "create_indexes"):
+                collection.create_indexes(USER_INDEXES + REFRESH_TOKEN_INDEXES)
+        except OperationFailure as err:
+            if err.code != DUPLICATE_KEY:
+                logging.error(
+                    "Error creating indexes on '%s' collection: %s",
+                    collection_name,
+                    err,
                 )
+                raise err
+            # one index at a time, to build the others and name the failing ones
+            for index in USER_INDEXES + REFRESH_TOKEN_INDEXES:
+                try:
+                    collection.create_indexes([index])
+                except OperationFailure as index_err:
+                    if index_err.code != DUPLICATE_KEY:
+                        raise index_err
+                    log_duplicates(collection_name, index, index_err)
+            return False
+        except Exception as err:
+            logging.error(
+                "Error creating indexes on '%s' collection: %s", collection_name, err
+            )
+            raise err
+        logging.info("Ensured indexes on '%s' collection.", collection_name)
+        return True
+
+    def warm_collections(self) -> None:
+        """Ensure the user indexes on every app collection and load the registry."""
+        with time_stage("mongo", "list_collections"):
+            collection_names = self.db.list_collection_names()
+        incomplete = [
+            collection_name
+            for collection_name in collection_names
+            if not self.ensure_indexes(collection_name)
+        ]
+        if incomplete:
+            logging.error(
+                "Refusing signups into collections without their unique indexes: %s.",
+                incomplete,
+            )
+        self.incomplete_collections = set(incomplete)
+        self.collections.load(collection_names)
+        logging.info("Warmed registry with %s collections.", len(collection_names))
+
+
+class AsyncMongoHandler:
+    """asyncio counterpart of MongoHandler, backed by the motor driver.
+
+    Its calls are not wrapped in stage timers: an awaited call also takes the
+    time other coroutines run before this one resumes. Round trips are timed
+    by the driver instead, as the mongo_command stages.
+    """
+
+    def __init__(
+        self,
+        connection_string,
+        database_name,
+        collection_registry_ttl: Optional[float] = None,
+        client_options: Optional[dict] = None,
+        read_preference: str = "primary",
+        write_concern: Optional[dict] = None,
+    ):
+        """`client_options` are passed to the driver client as is, e.g.
+        maxPoolSize or serverSelectionTimeoutMS; `read_preference` applies to
+        user lookups and `write_concern` (w, j, wtimeout) to inserts.
+        """
+        # motor is only imported by deployments that enable the async driver
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        try:
+            self.pool_stats = PoolStatsListener()
+            self.client = AsyncIOMotorClient(
+                connection_string,
+                event_listeners=driver_listeners(self.pool_stats),
+                **(client_options or {}),
+            )
+            self.db = self.client[database_name]
+            self.lookup_db, self.insert_db = database_views(
+                self.client, database_name, read_preference, write_concern
+            )
+            self.collections = CollectionRegistry(ttl=collection_registry_ttl)
+            # collections whose unique indexes failed to build at warm-up
+            self.incomplete_collections: Set[str] = set()
+            logging.info("Connected to mongoDB on %s database (async).", database_name)
+        except PyMongoError as err:
+            logging.error("Failed to connect to MongoDB: %s", err)
+            raise err
+
+    def close(self) -> None:
+        self.client.close()
+        logging.info("Closed mongoDB connections.")
+
+    async def ping(self) -> None:
+        """Round trip to the server, raises when it cannot be reached."""
+        await self.client.admin.command("ping")
+
+    async def get_document(
+        self,
+        collection_name: str,
+        filter_query: dict,
+        projection: Optional[dict] = None,
+    ) -> Optional[dict]:
+        """Retrieve a document matching the filter query, limited to `projection`."""
+        try:
+            logging.debug("getting a document...")
+            collection = self.lookup_db[collection_name]
+            document = await collection.find_one(filter_query, projection)
+            logging.debug("Got a document from %s collection.", collection_name)
+            return document
+        except Exception as err:
+            logging.error(
+                "Error retrieving document from '%s' collection: %s",
+                collection_name,
+                err,
+            )
+            raise err
+
+    async def create(self, collection_name: str, document) -> str:
+        """Insert a new document into the specified collection.
+
+        Meant for signups, so the write waits for the signup write concern.
+        """
+        try:
+            logging.debug("creating collection %s", collection_name)
+            collection = self.insert_db[collection_name]
+            result = await collection.insert_one(document)
+            logging.debug("created collection %s", collection_name)
+            return result.inserted_id
+        except Exception as err:
+            logging.error(
+                "Error creating document in collection '%s': %s", collection_name, err
+            )
+            raise err
+
+    async def create_token(self, collection_name: str, document: dict) -> None:
+        """Insert a refresh token with the client's default write concern."""
+        try:
+            await self.db[collection_name].insert_one(document)
+        except Exception as err:
+            logging.error(
+                "Error storing refresh token in '%s' collection: %s",
+                collection_name,
+                err,
+            )
+            raise err
 
+    async def create_many(self, collection_name: str, documents: list) -> List[dict]:
+        """Insert documents unordered and return the write errors of rejected ones."""
+        try:
+            logging.debug(
+                "inserting %s documents in %s", len(documents), collection_name
+            )
+            collection = self.insert_db[collection_name]
+            await collection.insert_many(documents, ordered=False)
+            return []
+        except BulkWriteError as err:
+            logging.debug(
+                "%s documents rejected by %s",
+                len(err.details["writeErrors"]),
+                collection_name,
+            )
+            return err.details["writeErrors"]
         except Exception as err:
-            logging.error(f"Error deleting document: {err}")
+            logging.error(
+                "Error creating documents in collection '%s': %s", collection_name, err
+            )
             raise err
 
+    async def upsert(
+        self, collection_name: str, filter_query: dict, update_data: dict
+    ) -> str:
+        """Insert or update a document based on a filter query."""
+        try:
+            logging.debug("upserting a document...")
+            collection = self.db[collection_name]
+            result = await collection.update_one(
+                filter_query, {"$set": update_data}, upsert=True
+            )
+            logging.debug("Upserted a document.")
+            return result.upserted_id if result.upserted_id else "Updated"
+        except Exception as err:
+            logging.error(
+                "Error upserting document on '%s' collection: %s", collection_name, err
+            )
+            raise err
+
+    async def bulk_update(self, collection_name: str, updates: List[tuple]) -> int:
+        """Apply (filter, update) pairs in one unordered bulk write.
+
+        Returns how many documents matched; filters matching nothing are skipped.
+        """
+        try:
+            collection = self.db[collection_name]
+            result = await collection.bulk_write(
+                [UpdateOne(filter_query, update) for filter_query, update in updates],
+                ordered=False,
+            )
+            return result.matched_count
+        except Exception as err:
+            logging.error(
+                "Error bulk updating '%s' collection: %s", collection_name, err
+            )
+            raise err
+
+    async def delete_document(self, collection_name: str, filter_query) -> None:
+        """Delete documents matching the filter query."""
+        try:
+            collection = self.db[collection_name]
+            await collection.delete_one(filter_query)
+        except Exception as err:
+            logging.error("Error deleting document: %s", err)
+            raise err
+
+    async def delete_documents(self, collection_name: str, filter_query: dict) -> int:
+        """Delete every document matching the filter query, return how many."""
+        try:
+            collection = self.db[collection_name]
+            result = await collection.delete_many(filter_query)
+            return result.deleted_count
+        except Exception as err:
+            logging.error(
+                "Error deleting documents from '%s' collection: %s",
+                collection_name,
+                err,
+            )
+            raise err
+
+    async def pop_document(
+        self, collection_name: str, filter_query: dict
+    ) -> Optional[dict]:
+        """Atomically fetch and delete a document, for single use credentials."""
+        try:
+            collection = self.db[collection_name]
+            return await collection.find_one_and_delete(filter_query)
+        except Exception as err:
+            logging.error(
+                "Error popping document from '%s' collection: %s", collection_name, err
+            )
+            raise err
+
+    async def create_collection_if_not_exist(self, collection_name: str) -> None:
+        """Make sure a collection can take signups, creating it when missing."""
+        if collection_name in self.incomplete_collections:
+            raise MissingUniqueIndexError(collection_name)
+        try:
+            if self.collections.lookup(collection_name):
+                return
+
+            # lazy refresh: the collection may have been created by another worker,
+            # or the registry expired. Names only: indexes of existing collections
+            # are ensured at startup (warm_collections), new ones below.
+            collection_names = await self.db.list_collection_names()
+            self.collections.load(collection_names)
+
+            if collection_name not in collection_names:
+                try:
+                    await self.db.create_collection(collection_name, check_exists=False)
+                    logging.info("created collection '%s' !", collection_name)
+                except (CollectionInvalid, OperationFailure) as err:
+                    if getattr(err, "code", NAMESPACE_EXISTS) != NAMESPACE_EXISTS:
+                        raise err
+                    logging.info(
+                        "Collection '%s' already exists, not necessary create it again.",
+                        collection_name,
+                    )
+                await self.ensure_indexes(collection_name)
+                self.collections.add(collection_name)
+
+        except Exception as err:
+            logging.error("Error deleting document: %s", err)
+            raise err
+
+    async def ensure_indexes(self, collection_name: str) -> bool:
+        """Create the user and refresh token indexes, a no-op if present.
+
+        As with MongoHandler, unique indexes blocked by duplicates are logged
+        and skipped, and False is returned.
+        """
+        collection = self.db[collection_name]
+        try:
+            await collection.create_indexes(USER_INDEXES + REFRESH_TOKEN_INDEXES)
+        except OperationFailure as err:
+            if err.code != DUPLICATE_KEY:
+                logging.error(
+                    "Error creating indexes on '%s' collection: %s",
+                    collection_name,
+                    err,
+                )
+                raise err
+            for index in USER_INDEXES + REFRESH_TOKEN_INDEXES:
+                try:
+                    await collection.create_indexes([index])
+                except OperationFailure as index_err:
+                    if index_err.code != DUPLICATE_KEY:
+                        raise index_err
+                    log_duplicates(collection_name, index, index_err)
+            return False
+        except Exception as err:
+            logging.error(
+                "Error creating indexes on '%s' collection: %s", collection_name, err
+            )
+            raise err
+        logging.info("Ensured indexes on '%s' collection.", collection_name)
+        return True
+
+    async def warm_collections(self) -> None:
+        """Ensure the user indexes on every app collection and load the registry."""
+        collection_names = await self.db.list_collection_names()
+        incomplete = [
+            collection_name
+            for collection_name in collection_names
+            if not await self.ensure_indexes(collection_name)
+        ]
+        if incomplete:
+            logging.error(
+                "Refusing signups into collections without their unique indexes: %s.",
+                incomplete,
+            )
+        self.incomplete_collections = set(incomplete)
+        self.collections.load(collection_names)
+        logging.info("Warmed registry with %s collections.", len(collection_names))
+
 
 if __name__ == "__main__":
     # Setting up
@@ -0,0 +1,91 @@
+import logging
+import threading
+from typing import Dict
+
+from pymongo import monitoring
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Connection pool counters, fed by the driver's pool events.
+
+    Shows whether requests queue for a connection: `waiters` are check outs
+    in progress, `checked_out` connections in use, and the wait time is how
+    long check outs took, including failed ones (waitQueueTimeoutMS).
+    Counters sum up over every server the client talks to.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.waiters = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.clears = 0
+
+    def _waited(self, duration) -> None:
+        self.waiters -= 1
+        if duration is not None:
+            self.wait_seconds_total += duration
+            self.wait_seconds_max = max(self.wait_seconds_max, duration)
+
+    def connection_check_out_started(self, event) -> None:
+        with self._lock:
+            self.waiters += 1
+
+    def connection_checked_out(self, event) -> None:
+        with self._lock:
+            self._waited(event.duration)
+            self.checkouts += 1
+            self.checked_out += 1
+
+    def connection_check_out_failed(self, event) -> None:
+        with self._lock:
+            self._waited(event.duration)
+            self.checkout_failures += 1
+        logging.warning(
+            "Mongo connection check out failed on %s: %s", event.address, event.reason
+        )
+
+    def connection_checked_in(self, event) -> None:
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event) -> None:
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event) -> None:
+        with self._lock:
+            self.open -= 1
+
+    def pool_cleared(self, event) -> None:
+        with self._lock:
+            self.clears += 1
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "waiters": self.waiters,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "clears": self.clears,
+            }
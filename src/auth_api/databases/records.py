@@ -0,0 +1,46 @@
+from typing import Optional
+
+
+class UserRecord:
+    """The fields of a user document the endpoints read.
+
+    Users are fetched with `PROJECTION`, so Mongo only sends (and the driver
+    only decodes) these fields, and the record keeps them in slots instead of
+    a per-instance dict.
+    """
+
+    __slots__ = ("user_id", "user_name", "password", "token", "role")
+
+    PROJECTION = {
+        "_id": 0,
+        "user_id": 1,
+        "user_name": 1,
+        "password": 1,
+        "token": 1,
+        "role": 1,
+    }
+
+    def __init__(
+        self, user_id: int, user_name: str, password: str, token: str, role: str
+    ):
+        self.user_id = user_id
+        self.user_name = user_name
+        self.password = password
+        self.token = token
+        self.role = role
+
+    @classmethod
+    def from_document(cls, document: Optional[dict]) -> Optional["UserRecord"]:
+        if document is None:
+            return None
+        return cls(
+            document["user_id"],
+            document["user_name"],
+            document["password"],
+            document["token"],
+            document["role"],
+        )
+
+    def __repr__(self) -> str:
+        # never echo the password hash or token into logs
+        return f"UserRecord(user_id={self.user_id!r}, user_name={self.user_name!r})"
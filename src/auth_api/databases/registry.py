@@ -0,0 +1,60 @@
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+
+class CollectionRegistry:
+    """In-process record of the collections known to exist in the database.
+
+    Lets MongoHandler skip a list_collections round trip on every signup. The
+    registry is warmed at startup and refreshed lazily on a miss; with a `ttl`
+    (seconds) it also forgets everything periodically so collections dropped
+    behind our back are noticed.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._names = set()
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def _expire_if_stale(self) -> None:
+        if self.ttl is not None and self.loaded:
+            if time.monotonic() - self._loaded_at > self.ttl:
+                self._names = set()
+                self._loaded_at = None
+
+    def lookup(self, name: str) -> bool:
+        """Check a collection name, counting the hit or miss."""
+        with self._lock:
+            self._expire_if_stale()
+            if name in self._names:
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            self._expire_if_stale()
+            return name in self._names
+
+    def load(self, names: Iterable[str]) -> None:
+        """Replace the registry content with a fresh listing from the server."""
+        with self._lock:
+            self._names = set(names)
+            self._loaded_at = time.monotonic()
+
+    def add(self, name: str) -> None:
+        with self._lock:
+            self._names.add(name)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._names)}
@@ -0,0 +1,46 @@
+from typing import Awaitable, Callable, Dict, Optional
+
+from auth_api.databases.records import UserRecord
+from auth_api.utils.cache import LRUCache
+
+
+class UserRecordCache:
+    """Read-through cache of user records keyed by (app_name, user_name).
+
+    Spares the find_one of hot accounts that log in over and over. Writers
+    invalidate the entry of the user they changed; each invalidation also bumps
+    a generation counter so a lookup that raced with the write does not put
+    the stale record back. Other workers only see a change once their entry
+    expires, so `ttl` bounds how stale a record can get.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self._entries = LRUCache(max_size, ttl=ttl)
+        self._generation = 0
+
+    async def get(
+        self,
+        app_name: str,
+        user_name: str,
+        load: Callable[[], Awaitable[Optional[UserRecord]]],
+    ) -> Optional[UserRecord]:
+        key = (app_name, user_name)
+        record = self._entries.get(key)
+        if record is not None:
+            return record
+
+        generation = self._generation
+        record = await load()
+        if record is not None and generation == self._generation:
+            self._entries.set(key, record)
+        return record
+
+    def invalidate(self, app_name: str, user_name: str) -> None:
+        self._generation += 1
+        self._entries.invalidate((app_name, user_name))
+
+    def stats(self) -> Dict[str, float]:
+        stats = self._entries.stats()
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """Thread-safe LRU mapping whose entries can expire.
+
+    Each entry expires at the explicit `expires_at` timestamp given to `set`,
+    or `ttl` seconds after insertion when no timestamp is given. Once
+    `max_size` entries are held, the least recently used one is evicted.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> Optional[Any]:
+        now = self.clock() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and now >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(
+        self, key: Hashable, value: Any, expires_at: Optional[float] = None
+    ) -> None:
+        if expires_at is None and self.ttl is not None:
+            expires_at = self.clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+            }
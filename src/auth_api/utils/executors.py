@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when a BoundedExecutor has no free slot for a new job."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("CPU executor queue is full")
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """Process or thread pool that rejects work once its queue is full.
+
+    At most `max_workers` jobs run at once and at most `max_queue` more wait for
+    a worker; anything beyond that fails fast with ExecutorSaturatedError so
+    callers can shed load instead of queueing without bound.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: Optional[int] = None,
+        max_queue: int = 64,
+        retry_after: int = 1,
+    ):
+        if kind == "process":
+            self.executor: Executor = ProcessPoolExecutor(max_workers=max_workers)
+        elif kind == "thread":
+            self.executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="auth-cpu"
+            )
+        else:
+            raise ValueError(
+                f"Unknown executor kind '{kind}', use 'process' or 'thread'"
+            )
+
+        self.kind = kind
+        self.max_workers = self.executor._max_workers
+        self.capacity = self.max_workers + max_queue
+        self.retry_after = retry_after
+        self._pending = 0
+        self._lock = threading.Lock()
+        logging.info(
+            "Started %s CPU executor with %s workers and %s queue slots.",
+            kind,
+            self.max_workers,
+            max_queue,
+        )
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, func, *args, **kwargs):
+        """Run `func` on the pool and await its result without blocking the loop."""
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise ExecutorSaturatedError(self.retry_after)
+            self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, partial(func, *args, **kwargs)
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.executor.shutdown(wait=wait)
+        logging.info("Stopped %s CPU executor.", self.kind)
@@ -0,0 +1,82 @@
+import logging
+import queue
+import random
+from contextvars import ContextVar, Token
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s - [{app_name}] - %(levelname)s:  %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# whether DEBUG lines of the current request are kept, set by the middleware
+_debug_sampled: ContextVar[bool] = ContextVar("debug_sampled", default=True)
+
+
+def sample_request(rate: float) -> Token:
+    """Decide once per request whether its DEBUG lines are emitted."""
+    # log sampling is not security sensitive, a fast non-crypto PRNG is enough
+    return _debug_sampled.set(rate >= 1.0 or random.random() < rate)  # nosec B311
+
+
+def reset_sampling(token: Token) -> None:
+    _debug_sampled.reset(token)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Drop DEBUG records of the requests left out of the sample."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or _debug_sampled.get()
+
+
+class LazyQueueHandler(QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread.
+
+    The stock handler formats every record on the caller before enqueueing it;
+    here the record goes through untouched, so the request path only pays for
+    building the LogRecord. Log arguments must therefore not be mutated after
+    the logging call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(
+    app_name: str,
+    mode: str = "sync",
+    level: str = "INFO",
+    debug_sample_rate: float = 1.0,
+) -> Optional[QueueListener]:
+    """Configure the root logger, returning the listener to stop in "queue" mode.
+
+    "sync" writes from the calling thread, as a plain StreamHandler does;
+    "queue" hands records to a background QueueListener that formats and
+    writes them.
+    """
+    for handler in logging.root.handlers[:]:
+        logging.root.removeHandler(handler)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter(LOG_FORMAT.format(app_name=app_name), DATE_FORMAT)
+    )
+
+    listener = None
+    if mode == "queue":
+        records = queue.SimpleQueue()
+        handler = LazyQueueHandler(records)
+        listener = QueueListener(records, stream_handler)
+    elif mode == "sync":
+        handler = stream_handler
+    else:
+        raise ValueError(f"Unknown logging mode '{mode}', use 'sync' or 'queue'")
+
+    if debug_sample_rate < 1.0:
+        handler.addFilter(DebugSamplingFilter())
+    logging.root.addHandler(handler)
+    logging.root.setLevel(level)
+
+    if listener is not None:
+        listener.start()
+    return listener
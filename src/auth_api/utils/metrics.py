@@ -0,0 +1,175 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# seconds; bcrypt sits around 0.1-0.5, Mongo and JWT well under 0.01
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+_NULL_TIMER = nullcontext()
+
+
+def _format_labels(labelnames: Sequence[str], labels: Sequence[str]) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in zip(labelnames, labels))
+
+
+class Histogram:
+    """Prometheus style histogram keyed by a tuple of label values."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bucket] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            snapshot = sorted(
+                (labels, list(counts), total, count)
+                for labels, (counts, total, count) in self._series.items()
+            )
+        for labels, counts, total, count in snapshot:
+            label_str = _format_labels(self.labelnames, labels)
+            prefix = f"{label_str}," if label_str else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label_str}}} {total}")
+            lines.append(f"{self.name}_count{{{label_str}}} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(self.labels, time.perf_counter() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """Process wide metrics, rendered in the Prometheus text exposition format.
+
+    While disabled, `time` hands back a shared no-op context manager, so the
+    instrumented code paths pay one attribute check per stage.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._histograms: Dict[str, Histogram] = {}
+        self._gauges: Dict[str, tuple] = {}
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        if name not in self._histograms:
+            self._histograms[name] = Histogram(name, documentation, labelnames, buckets)
+        return self._histograms[name]
+
+    def time(self, histogram: Histogram, *labels: str):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(histogram, labels)
+
+    def observe(self, histogram: Histogram, value: float, *labels: str) -> None:
+        if self.enabled:
+            histogram.observe(labels, value)
+
+    def register_gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelname: str,
+        supplier: Callable[[], Dict[str, float]],
+        kind: str = "gauge",
+    ) -> None:
+        """Export values read at scrape time, e.g. cache hit/miss counters.
+
+        Registering a name again replaces its supplier, e.g. on app restart.
+        """
+        self._gauges[name] = (documentation, labelname, supplier, kind)
+
+    def render(self) -> str:
+        lines = []
+        for histogram in self._histograms.values():
+            lines.extend(histogram.render())
+        for name, (documentation, labelname, supplier, kind) in self._gauges.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for label, value in supplier().items():
+                lines.append(f'{name}{{{labelname}="{label}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "auth_api_stage_duration_seconds",
+    "Time spent in each processing stage.",
+    ("component", "stage"),
+)
+REQUEST_SECONDS = metrics.histogram(
+    "auth_api_request_duration_seconds",
+    "Total time spent serving each endpoint.",
+    ("method", "path", "status"),
+)
+
+
+def time_stage(component: str, stage: str):
+    """Time a block as one stage of `component`, a no-op while metrics are off."""
+    if not metrics.enabled:
+        return _NULL_TIMER
+    return _Timer(STAGE_SECONDS, (component, stage))
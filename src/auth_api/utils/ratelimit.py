@@ -0,0 +1,60 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+
+
+class TokenBucketLimiter:
+    """Token bucket per key, refilled at `rate` tokens per second up to `burst`.
+
+    At most `max_keys` buckets are kept; the least recently used one is
+    dropped beyond that, which bounds memory at the price of forgetting the
+    quietest clients first. Meant to be called from the event loop only, so
+    it takes no lock.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_keys: int = 100000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.clock = clock
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+        # key -> [tokens left, time of the last refill]
+        self._buckets: "OrderedDict[Hashable, list]" = OrderedDict()
+
+    def acquire(self, key: Hashable) -> Tuple[bool, float]:
+        """Take one token for `key`, answering whether it was allowed and, if
+        not, the seconds until a token is available again."""
+        now = self.clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            self.allowed += 1
+            return True, 0.0
+        self.rejected += 1
+        return False, (1 - bucket[0]) / self.rate
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "evictions": self.evictions,
+            "keys": len(self._buckets),
+        }
@@ -0,0 +1,55 @@
+import asyncio
+import hashlib
+import hmac
+import secrets
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Runs concurrent calls sharing a key once, handing every caller the result.
+
+    The shared call runs as its own task, so a caller that goes away (client
+    disconnect) does not cancel it for the others. Keys are meant to come from
+    `fingerprint`, an HMAC under a key drawn per process, so secrets such as
+    passwords are never kept in memory as is.
+    """
+
+    def __init__(self):
+        self.executed = 0
+        self.coalesced = 0
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._key = secrets.token_bytes(32)
+
+    def fingerprint(self, *parts: str) -> bytes:
+        message = b"".join(
+            len(encoded).to_bytes(4, "big") + encoded
+            for encoded in (part.encode("utf-8") for part in parts)
+        )
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # mark the error as retrieved even when every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+        }
@@ -10,7 +10,7 @@ def read_yaml(path: str) -> dict:
             data = yaml.safe_load(file)
             return data
         except Exception as err:
-            logging.error(f"Error reading YAML file: {err}")
+            logging.error("Error reading YAML file: %s", err)
             raise err
 
 
@@ -11,7 +11,8 @@ from auth_api.utils.tools import read_yaml
 @pytest.fixture
 def test_client():
     """Fixture for creating a test client."""
-    return TestClient(app)
+    with TestClient(app) as client:
+        yield client
 
 
 @pytest.fixture
@@ -238,3 +239,173 @@ def test_renew_credentials_success(test_client, mock_mongo_handler):
     mock_mongo_handler.upsert(
         "app-test", filter_query={"user_name": "usertest3"}, update_data=doc_old_state
     )
+
+
+def test_verify_valid_token(test_client, mock_mongo_handler):
+    """Test a stored token is accepted by the stateless verify endpoint."""
+    USER_ID = 160
+    test_client.post(
+        "/auth-api/v1/signup",
+        json={
+            "app_name": "app-test",
+            "user_id": USER_ID,
+            "user_name": f"usertest{USER_ID}",
+            "password": "test123",
+            "role": "user",
+        },
+    )
+    document = mock_mongo_handler.get_document(
+        "app-test", filter_query={"user_name": f"usertest{USER_ID}"}
+    )
+
+    response = test_client.get(
+        "/auth-api/v1/verify",
+        headers={"Authorization": f"Bearer {document['token']}"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "VALID_TOKEN"
+    assert response.json()["claims"]["user_id"] == USER_ID
+    assert "password" not in response.json()["claims"]
+    mock_mongo_handler.delete_document(
+        "app-test", {"user_id": USER_ID, "user_name": f"usertest{USER_ID}"}
+    )
+
+
+def test_verify_invalid_token(test_client):
+    """Test a forged token is rejected by the verify endpoint."""
+
+    response = test_client.get(
+        "/auth-api/v1/verify", headers={"Authorization": "Bearer not-a-jwt"}
+    )
+
+    assert response.status_code == 401
+    assert response.json() == {
+        "status": "INVALID_TOKEN",
+        "message": "Token is invalid, enter in contact with your administrator",
+    }
+
+
+def test_bulk_signup_reports_duplicates(test_client, mock_mongo_handler):
+    """Test bulk signup records new users and flags duplicated ones."""
+    USER_IDS = [170, 171]
+    users = [
+        {
+            "app_name": "app-test",
+            "user_id": user_id,
+            "user_name": f"usertest{user_id}",
+            "password": "test123",
+            "role": "user",
+        }
+        for user_id in USER_IDS
+    ]
+
+    response = test_client.post(
+        "/auth-api/v1/signup/bulk", json={"users": users + users[:1]}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 2
+    assert response.json()["duplicated"] == 1
+    assert response.json()["results"][2]["status"] == "DUPLICATED"
+    for user_id in USER_IDS:
+        mock_mongo_handler.delete_document(
+            "app-test", {"user_id": user_id, "user_name": f"usertest{user_id}"}
+        )
+
+
+def test_verify_batch_keeps_request_order(test_client):
+    """Test batch verification answers one status per token, in order."""
+
+    response = test_client.post(
+        "/auth-api/v1/verify/batch", json={"tokens": ["not-a-jwt", "still-not"]}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"results": ["INVALID_TOKEN", "INVALID_TOKEN"]}
+
+
+def test_refresh_token_rotates_once(test_client, mock_mongo_handler):
+    """Test a refresh token yields new tokens once and is refused afterwards."""
+    USER_ID = 180
+    test_client.post(
+        "/auth-api/v1/signup",
+        json={
+            "app_name": "app-test",
+            "user_id": USER_ID,
+            "user_name": f"usertest{USER_ID}",
+            "password": "test123",
+            "role": "user",
+        },
+    )
+    tokens = test_client.post(
+        "/auth-api/v1/token",
+        json={
+            "app_name": "app-test",
+            "user_name": f"usertest{USER_ID}",
+            "password": "test123",
+        },
+    ).json()
+    refresh_request = {"app_name": "app-test", "refresh_token": tokens["refresh_token"]}
+
+    response = test_client.post("/auth-api/v1/token/refresh", json=refresh_request)
+    reused = test_client.post("/auth-api/v1/token/refresh", json=refresh_request)
+
+    assert response.status_code == 200
+    assert response.json()["refresh_token"] != tokens["refresh_token"]
+    assert reused.status_code == 401
+    assert reused.json()["status"] == "INVALID_REFRESH_TOKEN"
+    mock_mongo_handler.pop_document(
+        "app-test",
+        {
+            "refresh_token": Authenticator.refresh_token_digest(
+                response.json()["refresh_token"]
+            )
+        },
+    )
+    mock_mongo_handler.delete_document(
+        "app-test", {"user_id": USER_ID, "user_name": f"usertest{USER_ID}"}
+    )
+
+
+def test_password_change_revokes_refresh_tokens(test_client, mock_mongo_handler):
+    """Test refresh tokens issued before a password change are refused after it."""
+    USER_ID = 181
+    test_client.post(
+        "/auth-api/v1/signup",
+        json={
+            "app_name": "app-test",
+            "user_id": USER_ID,
+            "user_name": f"usertest{USER_ID}",
+            "password": "test123",
+            "role": "user",
+        },
+    )
+    tokens = test_client.post(
+        "/auth-api/v1/token",
+        json={
+            "app_name": "app-test",
+            "user_name": f"usertest{USER_ID}",
+            "password": "test123",
+        },
+    ).json()
+    test_client.post(
+        "/auth-api/v1/renew-credentials",
+        json={
+            "app_name": "app-test",
+            "user_name": f"usertest{USER_ID}",
+            "old_password": "test123",
+            "new_password": "test456",
+        },
+    )
+
+    response = test_client.post(
+        "/auth-api/v1/token/refresh",
+        json={"app_name": "app-test", "refresh_token": tokens["refresh_token"]},
+    )
+
+    assert response.status_code == 401
+    assert response.json()["status"] == "INVALID_REFRESH_TOKEN"
+    mock_mongo_handler.delete_document(
+        "app-test", {"user_id": USER_ID, "user_name": f"usertest{USER_ID}"}
+    )
@@ -0,0 +1,216 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import bcrypt
+import jwt
+import pytz
+
+from auth_api.app.authentication import Authenticator
+from auth_api.app.models import AuthConfig, RegisterPayload
+from auth_api.utils.executors import BoundedExecutor
+from auth_api.utils.metrics import STAGE_SECONDS, metrics
+
+LEGACY_SALT = bcrypt.gensalt(rounds=4)
+TIME_ZONE = pytz.timezone("UTC")
+
+
+def make_authenticator(executor=None, **configs) -> Authenticator:
+    return Authenticator(
+        AuthConfig(
+            secret_key="secret",
+            expire_delta=60,
+            algorithm="HS256",
+            encrypt_key="key",
+            salt=LEGACY_SALT,
+            **{"hasher_params": {"rounds": 4}, **configs},
+        ),
+        executor,
+    )
+
+
+def test_hash_password_uses_a_salt_per_call():
+    """Test equal passwords get different hashes that still verify."""
+    authenticator = make_authenticator()
+
+    first = authenticator.hash_password("test123")
+    second = authenticator.hash_password("test123")
+
+    assert first != second
+    assert authenticator.verify_password("test123", first)
+    assert authenticator.verify_password("test123", second)
+    assert not authenticator.needs_rehash(first)
+
+
+def test_legacy_hash_needs_rehash():
+    """Test hashes made with the former global salt are flagged for migration."""
+    authenticator = make_authenticator()
+    legacy_hash = bcrypt.hashpw(b"test123key", LEGACY_SALT).decode("utf-8")
+
+    assert authenticator.verify_password("test123", legacy_hash)
+    assert authenticator.needs_rehash(legacy_hash)
+
+
+def test_hash_from_another_algorithm_verifies_and_needs_rehash():
+    """Test switching hashers keeps old hashes valid until they are upgraded."""
+    bcrypt_hash = make_authenticator().hash_password("test123")
+    authenticator = make_authenticator(
+        password_hasher="scrypt", hasher_params={"ln": 10}
+    )
+
+    assert authenticator.verify_password("test123", bcrypt_hash)
+    assert authenticator.needs_rehash(bcrypt_hash)
+
+
+def test_v2_token_has_no_password_and_v1_tokens_still_verify():
+    """Test v2 tokens carry numeric claims only while v1 tokens stay accepted."""
+    now = datetime.now(tz=TIME_ZONE)
+    payload = RegisterPayload(
+        app_name="app-test",
+        user_id=1,
+        user_name="usertest1",
+        password="test123",
+        role="user",
+        expire=(now + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S"),
+    )
+    v1_token = make_authenticator().create_jwt_token(payload, "hashed")
+    authenticator = make_authenticator(token_version=2)
+
+    v2_token = authenticator.create_jwt_token(
+        payload, expire_at=now + timedelta(hours=1)
+    )
+    status, claims = authenticator.decode_jwt_token(v2_token, now, TIME_ZONE)
+
+    assert status == "VALID_TOKEN"
+    assert claims["sub"] == "usertest1"
+    assert isinstance(claims["exp"], int)
+    assert "password" not in jwt.decode(v2_token, options={"verify_signature": False})
+    assert authenticator.validate_jwt_token(v1_token, now, TIME_ZONE) == "VALID_TOKEN"
+
+
+def test_expired_v2_token_honours_leeway():
+    """Test an expired v2 token is accepted only within the configured leeway."""
+    now = datetime.now(tz=TIME_ZONE)
+    payload = RegisterPayload(
+        app_name="app-test",
+        user_id=1,
+        user_name="usertest1",
+        password="test123",
+        role="user",
+        expire="",
+    )
+    expired_at = now - timedelta(seconds=30)
+    strict = make_authenticator(token_version=2)
+    lenient = make_authenticator(token_version=2, token_leeway=60)
+
+    token = strict.create_jwt_token(payload, expire_at=expired_at)
+
+    assert strict.validate_jwt_token(token, now, TIME_ZONE) == "TOKEN_EXPIRED"
+    assert lenient.validate_jwt_token(token, now, TIME_ZONE) == "VALID_TOKEN"
+
+
+def test_expiry_is_exact_outside_utc():
+    """Test v1 and v2 expiry in a zone whose pytz LMT offset is not its offset."""
+    sao_paulo = pytz.timezone("America/Sao_Paulo")
+    now = datetime.now(tz=sao_paulo)
+    authenticator = make_authenticator(token_version=2, token_cache_size=8)
+    legacy = make_authenticator()
+
+    def v1_token(expire: datetime) -> str:
+        payload = RegisterPayload(
+            app_name="app-test",
+            user_id=1,
+            user_name="usertest1",
+            password="test123",
+            role="user",
+            expire=expire.strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        return legacy.create_jwt_token(payload, "hashed")
+
+    v2_token = authenticator.create_jwt_token(
+        RegisterPayload(
+            app_name="app-test",
+            user_id=1,
+            user_name="usertest1",
+            password="test123",
+            role="user",
+            expire="",
+        ),
+        expire_at=now + timedelta(minutes=3),
+    )
+
+    for _ in range(2):  # the second check is a token cache hit
+        status = authenticator.validate_jwt_token(v2_token, now, sao_paulo)
+        assert status == "VALID_TOKEN"
+    later = now + timedelta(minutes=4)
+    assert authenticator.validate_jwt_token(v2_token, later, sao_paulo) == (
+        "TOKEN_EXPIRED"
+    )
+    valid_v1 = v1_token(now + timedelta(minutes=3))
+    expired_v1 = v1_token(now - timedelta(minutes=3))
+    assert authenticator.validate_jwt_token(valid_v1, now, sao_paulo) == "VALID_TOKEN"
+    assert authenticator.validate_jwt_token(valid_v1, later, sao_paulo) == (
+        "TOKEN_EXPIRED"
+    )
+    assert authenticator.validate_jwt_token(expired_v1, now, sao_paulo) == (
+        "TOKEN_EXPIRED"
+    )
+
+
+def test_login_completes_while_bulk_hashing_runs():
+    """Test a password check queues behind a few bulk hashes, not the whole bulk."""
+    executor = BoundedExecutor(kind="thread", max_workers=1, max_queue=8)
+    authenticator = make_authenticator(executor)
+    hashed_password = authenticator.hash_password("test123")
+    finished = []
+
+    async def bulk():
+        hashed = await authenticator.hash_passwords_async(["bulk"] * 200)
+        finished.append("bulk")
+        return hashed
+
+    async def login():
+        await asyncio.sleep(0.01)
+        verified = await authenticator.verify_password_async("test123", hashed_password)
+        finished.append("login")
+        return verified
+
+    async def scenario():
+        return await asyncio.gather(bulk(), login())
+
+    hashed, verified = asyncio.run(scenario())
+    executor.shutdown()
+
+    assert verified
+    assert len(hashed) == 200
+    assert authenticator.verify_password("bulk", hashed[-1])
+    assert finished == ["login", "bulk"]
+
+
+def test_queue_wait_is_recorded_apart_from_hashing():
+    """Test a check queued behind a busy worker is not timed as verify_password."""
+    executor = BoundedExecutor(kind="thread", max_workers=1, max_queue=8)
+    authenticator = make_authenticator(executor)
+    hashed_password = authenticator.hash_password("test123")
+
+    def stage_seconds(component, stage):
+        series = STAGE_SECONDS._series.get((component, stage))
+        return series[1] if series else 0.0
+
+    async def scenario():
+        busy = asyncio.ensure_future(executor.run(time.sleep, 0.2))
+        await asyncio.sleep(0.01)
+        await authenticator.verify_password_async("test123", hashed_password)
+        await busy
+
+    verified_before = stage_seconds("authenticator", "verify_password")
+    waited_before = stage_seconds("cpu_executor", "queue_wait")
+    metrics.enabled = True
+    try:
+        asyncio.run(scenario())
+    finally:
+        metrics.enabled = False
+        executor.shutdown()
+
+    assert stage_seconds("authenticator", "verify_password") - verified_before < 0.1
+    assert stage_seconds("cpu_executor", "queue_wait") - waited_before > 0.1
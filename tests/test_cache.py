@@ -0,0 +1,43 @@
+from auth_api.utils.cache import LRUCache
+
+
+def test_cache_evicts_least_recently_used():
+    """Test the oldest untouched entry is evicted once the cache is full."""
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_expires_entries():
+    """Test entries past their expiry are dropped and counted as misses."""
+    now = [100.0]
+    cache = LRUCache(max_size=10, ttl=5, clock=lambda: now[0])
+    cache.set("ttl", "value")
+    cache.set("explicit", "value", expires_at=200.0)
+
+    now[0] = 106.0
+    assert cache.get("ttl") is None
+    assert cache.get("explicit") == "value"
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "expirations": 1,
+        "size": 1,
+    }
+
+
+def test_cache_invalidate():
+    """Test an invalidated entry is gone."""
+    cache = LRUCache(max_size=10)
+    cache.set("a", 1)
+    cache.invalidate("a")
+
+    assert cache.get("a") is None
@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+from auth_api.databases.command_timing import CommandTimingListener
+from auth_api.databases.mongo import MongoHandler
+from auth_api.utils.metrics import STAGE_SECONDS, metrics
+
+
+def test_commands_are_timed_by_driver_duration():
+    """Test round trips land in mongo_command stages with the driver's duration."""
+    listener = CommandTimingListener()
+    before = STAGE_SECONDS._series.get(("mongo_command", "find"), [None, 0.0, 0])
+
+    metrics.enabled = True
+    try:
+        listener.succeeded(SimpleNamespace(command_name="find", duration_micros=1500))
+        listener.failed(SimpleNamespace(command_name="find", duration_micros=500))
+    finally:
+        metrics.enabled = False
+
+    _, total, count = STAGE_SECONDS._series[("mongo_command", "find")]
+    assert count - before[2] == 2
+    assert abs(total - before[1] - 0.002) < 1e-9
+
+
+def test_commands_are_not_listened_to_with_metrics_disabled():
+    """Test the driver publishes no command events unless metrics are on."""
+
+    def command_listeners() -> list:
+        # the client connects lazily, so no server is needed
+        handler = MongoHandler("mongodb://localhost:27017/", "auth-api")
+        listeners = handler.client.options.event_listeners
+        handler.close()
+        return [type(listener) for listener in listeners]
+
+    disabled = command_listeners()
+    metrics.enabled = True
+    try:
+        enabled = command_listeners()
+    finally:
+        metrics.enabled = False
+
+    assert CommandTimingListener not in disabled
+    assert CommandTimingListener in enabled
@@ -0,0 +1,40 @@
+import asyncio
+import threading
+
+import pytest
+
+from auth_api.utils.executors import BoundedExecutor, ExecutorSaturatedError
+
+
+def test_executor_runs_job():
+    """Test a job result is returned to the awaiting coroutine."""
+    executor = BoundedExecutor(kind="thread", max_workers=1, max_queue=1)
+
+    assert asyncio.run(executor.run(pow, 2, 10)) == 1024
+    executor.shutdown()
+
+
+def test_executor_rejects_when_queue_is_full():
+    """Test jobs beyond workers + queue slots fail fast with retry hint."""
+    executor = BoundedExecutor(kind="thread", max_workers=1, max_queue=1, retry_after=3)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturatedError) as err:
+            await executor.run(release.wait)
+        release.set()
+        await asyncio.gather(*blocked)
+        return err.value
+
+    err = asyncio.run(scenario())
+    assert err.retry_after == 3
+    assert executor.pending == 0
+    executor.shutdown()
+
+
+def test_executor_unknown_kind():
+    """Test an unsupported executor kind is refused."""
+    with pytest.raises(ValueError):
+        BoundedExecutor(kind="gpu")
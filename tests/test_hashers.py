@@ -0,0 +1,46 @@
+import pytest
+
+from auth_api.app.hashers import (
+    Argon2Hasher,
+    BcryptHasher,
+    PasswordHasher,
+    ScryptHasher,
+    build_hasher,
+    identify_hasher,
+)
+
+
+def test_hashers_round_trip_and_identify_their_hashes():
+    """Test every backend verifies its own hashes and is found from them."""
+    for hasher in (
+        BcryptHasher(rounds=4),
+        ScryptHasher(ln=10),
+        Argon2Hasher(time_cost=1, memory_cost=8192, parallelism=1),
+    ):
+        encoded = hasher.hash(b"test123")
+
+        assert hasher.verify(b"test123", encoded)
+        assert not hasher.verify(b"wrong", encoded)
+        assert identify_hasher(encoded) is type(hasher)
+        assert not hasher.needs_rehash(encoded)
+
+
+def test_changed_params_need_rehash():
+    """Test hashes made with other cost parameters are flagged for rehash."""
+    encoded = build_hasher("scrypt", {"ln": 10}).hash(b"test123")
+
+    assert build_hasher("scrypt", {"ln": 11}).needs_rehash(encoded)
+    assert build_hasher("scrypt", {"ln": 11}).verify(b"test123", encoded)
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    """Test a backend missing part of the interface is refused when built."""
+
+    class HashOnly(PasswordHasher):
+        algorithm = "hash-only"
+
+        def hash(self, password: bytes) -> str:
+            return password.decode("utf-8")
+
+    with pytest.raises(TypeError):
+        HashOnly()
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import pytz
+
+from auth_api.app.authentication import Authenticator
+from auth_api.app.keys import generate_key_pair
+from auth_api.app.models import AuthConfig, RegisterPayload
+
+TIME_ZONE = pytz.timezone("UTC")
+
+
+def make_authenticator(signing_keys: list, active_kid: str = None) -> Authenticator:
+    return Authenticator(
+        AuthConfig(
+            secret_key="secret",
+            expire_delta=60,
+            algorithm="HS256",
+            encrypt_key="key",
+            hasher_params={"rounds": 4},
+            signing_keys=signing_keys,
+            active_kid=active_kid,
+        )
+    )
+
+
+def make_token(authenticator: Authenticator) -> str:
+    now = datetime.now(tz=TIME_ZONE)
+    payload = RegisterPayload(
+        app_name="app-test",
+        user_id=1,
+        user_name="usertest1",
+        password="test123",
+        role="user",
+        expire=(now + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S"),
+    )
+    return authenticator.create_jwt_token(payload, "hashed")
+
+
+def test_rotated_keys_keep_verifying_older_tokens(tmp_path):
+    """Test tokens signed before a rotation verify, and every key is published."""
+    old_key = generate_key_pair("RS256", "2024", str(tmp_path))
+    new_key = generate_key_pair("EdDSA", "2025", str(tmp_path))
+    now = datetime.now(tz=TIME_ZONE)
+
+    old_token = make_token(make_authenticator([old_key], "2024"))
+    legacy_token = make_token(make_authenticator([]))
+    authenticator = make_authenticator([old_key, new_key], "2025")
+    new_token = make_token(authenticator)
+
+    for token in (old_token, legacy_token, new_token):
+        assert authenticator.validate_jwt_token(token, now, TIME_ZONE) == "VALID_TOKEN"
+    assert [key["kid"] for key in authenticator.key_ring.jwks()["keys"]] == [
+        "2024",
+        "2025",
+    ]
+
+
+def test_token_with_unknown_kid_is_invalid(tmp_path):
+    """Test a token naming a key outside the ring is rejected."""
+    foreign = make_authenticator([generate_key_pair("EdDSA", "x", str(tmp_path))], "x")
+    authenticator = make_authenticator(
+        [generate_key_pair("EdDSA", "y", str(tmp_path))], "y"
+    )
+    now = datetime.now(tz=TIME_ZONE)
+
+    status = authenticator.validate_jwt_token(make_token(foreign), now, TIME_ZONE)
+
+    assert status == "INVALID_TOKEN"
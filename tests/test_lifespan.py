@@ -0,0 +1,34 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from auth_api.app import api
+from auth_api.databases.registry import CollectionRegistry
+
+
+def test_failed_startup_releases_resources():
+    """Test a warm-up failure still stops the executor and the event writer."""
+
+    class Unreachable:
+        collections = CollectionRegistry()
+
+        def warm_collections(self):
+            raise ConnectionError("mongo unreachable")
+
+    configs = {
+        "APP_NAME": "auth-api-test",
+        "TIME_ZONE": "UTC",
+        "AUTH_CONFIG": {
+            "secret_key": "secret",
+            "expire_delta": 60,
+            "algorithm": "HS256",
+            "encrypt_key": "key",
+        },
+        "LOGIN_EVENTS": {"enabled": True},
+        "APP_LOGGING": {"request_summary": False},
+    }
+    with pytest.raises(ConnectionError):
+        with TestClient(api.create_app(configs, Unreachable())):
+            pass
+
+    assert api.cpu_executor.executor._shutdown
+    assert api.login_events._task is None
@@ -0,0 +1,228 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from auth_api.databases.login_events import LoginEventRecorder
+
+
+def test_events_of_one_user_coalesce_into_one_update():
+    """Test a burst of logins of one user is written as a single update."""
+    writes = []
+
+    async def write(app_name, updates):
+        writes.append((app_name, updates))
+
+    async def scenario():
+        recorder = LoginEventRecorder(write, flush_interval=60)
+        recorder.start()
+        for success in (True, True, False):
+            recorder.record("app-test", "usertest1", success)
+        recorder.record("other-app", "usertest2", False)
+        await recorder.stop()
+        return recorder
+
+    recorder = asyncio.run(scenario())
+
+    updates = dict(writes)
+    assert set(updates) == {"app-test", "other-app"}
+    [(filter_query, update)] = updates["app-test"]
+    assert filter_query == {"user_name": "usertest1"}
+    assert update["$inc"] == {"login_count": 2, "failed_login_count": 1}
+    assert set(update["$max"]) == {"last_login_at", "last_failed_login_at"}
+    assert updates["other-app"][0][1]["$inc"] == {"failed_login_count": 1}
+    assert set(updates["other-app"][0][1]["$max"]) == {"last_failed_login_at"}
+    assert recorder.stats() == {
+        "recorded": 4,
+        "dropped": 0,
+        "flushed": 2,
+        "flush_errors": 0,
+        "pending": 0,
+    }
+
+
+def test_updates_leave_out_empty_operators():
+    """Test an update carries no empty $inc / $max, rejected by MongoDB < 5.0."""
+    now = datetime.now(timezone.utc)
+
+    assert LoginEventRecorder._update([0, 1, None, now]) == {
+        "$inc": {"failed_login_count": 1},
+        "$max": {"last_failed_login_at": now},
+    }
+    assert LoginEventRecorder._update([0, 0, None, None]) == {}
+
+
+def test_full_batch_flushes_before_the_interval():
+    """Test reaching batch_size pending users wakes the flush task early."""
+    writes = []
+
+    async def write(app_name, updates):
+        writes.append(len(updates))
+
+    async def scenario():
+        recorder = LoginEventRecorder(write, flush_interval=60, batch_size=3)
+        recorder.start()
+        for user in range(3):
+            recorder.record("app-test", f"user{user}", True)
+        await asyncio.sleep(0.01)
+        flushed_early = list(writes)
+        await recorder.stop()
+        return flushed_early
+
+    assert asyncio.run(scenario()) == [3]
+
+
+def test_new_users_are_dropped_while_full():
+    """Test max_pending bounds memory while events of held users still count."""
+
+    async def write(app_name, updates):
+        pass
+
+    recorder = LoginEventRecorder(write, max_pending=1)
+
+    recorder.record("app-test", "usertest1", True)
+    recorder.record("app-test", "usertest2", True)
+    recorder.record("app-test", "usertest1", False)
+
+    assert recorder.stats()["recorded"] == 2
+    assert recorder.stats()["dropped"] == 1
+    assert recorder.stats()["pending"] == 1
+
+
+def test_failed_write_is_merged_back_for_the_next_flush():
+    """Test a database error keeps the batch, merged with events recorded since."""
+    failures, writes = [RuntimeError("connection refused")], []
+
+    async def write(app_name, updates):
+        if failures:
+            raise failures.pop()
+        writes.extend(updates)
+
+    async def scenario():
+        recorder = LoginEventRecorder(write)
+        recorder.record("app-test", "usertest1", True)
+        await recorder.flush()
+        failed = recorder.stats()
+        recorder.record("app-test", "usertest1", False)
+        await recorder.flush()
+        return failed
+
+    failed = asyncio.run(scenario())
+
+    assert failed["flush_errors"] == 1
+    assert failed["flushed"] == 0
+    assert failed["pending"] == 1
+    [(_, update)] = writes
+    assert update["$inc"] == {"login_count": 1, "failed_login_count": 1}
+
+
+def test_stop_during_a_write_loses_no_events():
+    """Test stopping while the flush task writes lets that write complete."""
+    writes = []
+
+    async def write(app_name, updates):
+        await asyncio.sleep(0.05)
+        writes.extend(updates)
+
+    async def scenario():
+        recorder = LoginEventRecorder(write, flush_interval=60, batch_size=3)
+        recorder.start()
+        for user in range(3):
+            recorder.record("app-test", f"user{user}", True)
+        await asyncio.sleep(0.01)
+        await recorder.stop()
+        return recorder.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert len(writes) == 3
+    assert stats["flushed"] == 3
+    assert stats["dropped"] == 0
+
+
+def test_only_password_checks_of_existing_users_are_recorded():
+    """Test unknown names and stored token failures leave the counters alone."""
+    from fastapi.testclient import TestClient
+
+    from auth_api.app import api
+    from auth_api.app.authentication import Authenticator
+    from auth_api.app.models import AuthConfig, RegisterPayload
+    from auth_api.databases.registry import CollectionRegistry
+
+    auth_config = {
+        "secret_key": "secret",
+        "expire_delta": 60,
+        "algorithm": "HS256",
+        "encrypt_key": "key",
+        "hasher_params": {"rounds": 4},
+    }
+    authenticator = Authenticator(AuthConfig(**auth_config))
+
+    def user(user_name: str, expire: datetime) -> dict:
+        payload = RegisterPayload(
+            app_name="app-test",
+            user_id=len(user_name),
+            user_name=user_name,
+            password="test123",
+            role="user",
+            expire=expire.strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        hashed = authenticator.hash_password(payload.password)
+        token = authenticator.create_jwt_token(payload, hashed)
+        return {**payload.model_dump(), "password": hashed, "token": token}
+
+    now = datetime.now(timezone.utc)
+    users = {
+        "active": user("active", now + timedelta(hours=1)),
+        "lapsed": user("lapsed", now - timedelta(hours=1)),
+    }
+    writes = []
+
+    class TwoUsers:
+        collections = CollectionRegistry()
+
+        def warm_collections(self):
+            pass
+
+        def get_document(self, collection_name, filter_query, projection=None):
+            return users.get(filter_query.get("user_name"))
+
+        def create_token(self, collection_name, document):
+            pass
+
+        def bulk_update(self, collection_name, updates):
+            writes.extend(updates)
+            return len(updates)
+
+    configs = {
+        "APP_NAME": "auth-api-test",
+        "TIME_ZONE": "UTC",
+        "AUTH_CONFIG": auth_config,
+        "LOGIN_EVENTS": {"enabled": True, "flush_interval": 60},
+        "APP_LOGGING": {"request_summary": False},
+    }
+    attempts = [
+        ("/auth-api/v1/login", "active", "test123"),
+        ("/auth-api/v1/login", "active", "wrong"),
+        ("/auth-api/v1/login", "lapsed", "test123"),
+        ("/auth-api/v1/login", "nobody", "test123"),
+        ("/auth-api/v1/token", "active", "test123"),
+        ("/auth-api/v1/token", "lapsed", "wrong"),
+        ("/auth-api/v1/token", "nobody", "wrong"),
+    ]
+    with TestClient(api.create_app(configs, TwoUsers())) as client:
+        for path, user_name, password in attempts:
+            client.post(
+                path,
+                json={
+                    "app_name": "app-test",
+                    "user_name": user_name,
+                    "password": password,
+                },
+            )
+
+    counters = {
+        filter_query["user_name"]: update["$inc"] for filter_query, update in writes
+    }
+    assert counters == {
+        "active": {"login_count": 2, "failed_login_count": 1},
+        "lapsed": {"failed_login_count": 1},
+    }
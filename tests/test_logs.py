@@ -0,0 +1,36 @@
+import logging
+
+from auth_api.utils.logs import (
+    DebugSamplingFilter,
+    LazyQueueHandler,
+    reset_sampling,
+    sample_request,
+)
+
+
+def make_record(level: int, msg: str, *args) -> logging.LogRecord:
+    return logging.LogRecord("test", level, __file__, 1, msg, args, None)
+
+
+def test_sampling_drops_debug_of_unsampled_requests():
+    """Test DEBUG lines are dropped for requests left out of the sample."""
+    log_filter = DebugSamplingFilter()
+
+    token = sample_request(0.0)
+    try:
+        assert not log_filter.filter(make_record(logging.DEBUG, "step"))
+        assert log_filter.filter(make_record(logging.INFO, "summary"))
+    finally:
+        reset_sampling(token)
+
+    assert log_filter.filter(make_record(logging.DEBUG, "step"))
+
+
+def test_queue_handler_defers_formatting():
+    """Test records are enqueued with their arguments still unformatted."""
+    record = make_record(logging.INFO, "user %s", "alice")
+
+    prepared = LazyQueueHandler(None).prepare(record)
+
+    assert prepared.msg == "user %s"
+    assert prepared.args == ("alice",)
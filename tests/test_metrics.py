@@ -0,0 +1,72 @@
+from auth_api.utils.metrics import Histogram, MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test observations land in cumulative Prometheus buckets."""
+    histogram = Histogram("stage_seconds", "Stage time.", ("stage",), (0.1, 1.0))
+    histogram.observe(("hash",), 0.05)
+    histogram.observe(("hash",), 0.5)
+    histogram.observe(("hash",), 3.0)
+
+    lines = histogram.render()
+
+    assert 'stage_seconds_bucket{stage="hash",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="hash",le="1.0"} 2' in lines
+    assert 'stage_seconds_bucket{stage="hash",le="+Inf"} 3' in lines
+    assert 'stage_seconds_count{stage="hash"} 3' in lines
+
+
+def test_disabled_registry_records_nothing():
+    """Test timers are no-ops while the registry is disabled."""
+    registry = MetricsRegistry(enabled=False)
+    histogram = registry.histogram("stage_seconds", "Stage time.", ("stage",))
+
+    with registry.time(histogram, "hash"):
+        pass
+
+    assert "stage_seconds_count" not in registry.render()
+
+
+def test_fast_login_is_labelled_by_route():
+    """Test logins served by the FAST_LOGIN route keep their path label."""
+    from fastapi.testclient import TestClient
+
+    from auth_api.app import api
+    from auth_api.databases.registry import CollectionRegistry
+    from auth_api.utils.metrics import metrics
+
+    class NoUsers:
+        collections = CollectionRegistry()
+
+        def warm_collections(self):
+            pass
+
+        def get_document(self, collection_name, filter_query, projection=None):
+            return None
+
+    configs = {
+        "APP_NAME": "auth-api-test",
+        "TIME_ZONE": "UTC",
+        "AUTH_CONFIG": {
+            "secret_key": "secret",
+            "expire_delta": 60,
+            "algorithm": "HS256",
+            "encrypt_key": "key",
+        },
+        "FAST_LOGIN": {"enabled": True},
+        "METRICS": {"enabled": True},
+        "APP_LOGGING": {"request_summary": False},
+    }
+    try:
+        with TestClient(api.create_app(configs, NoUsers())) as client:
+            response = client.post(
+                "/auth-api/v1/login",
+                json={"app_name": "app-test", "user_name": "nobody", "password": "x"},
+            )
+            exported = client.get("/metrics").text
+    finally:
+        metrics.enabled = False
+
+    assert response.status_code == 403
+    assert 'path="/auth-api/v1/login",status="403"' in exported
+    assert 'path="unmatched"' not in exported
@@ -0,0 +1,260 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from auth_api.databases.mongo import (
+    DUPLICATE_KEY,
+    AsyncMongoHandler,
+    MissingUniqueIndexError,
+    MongoHandler,
+    duplicated_key,
+)
+
+
+class RecordingDatabase:
+    """Stands in for a pymongo Database, recording the index builds asked.
+
+    Index builds on `duplicates` (collection name -> index names) fail as
+    they would over documents sharing a unique key; inserted user names are
+    unique per collection.
+    """
+
+    def __init__(self, collection_names, duplicates=None):
+        self.collection_names = list(collection_names)
+        self.duplicates = duplicates or {}
+        self.indexed = []
+        self.built = set()
+        self.user_names = {}
+        self.inserted = []
+
+    def list_collection_names(self):
+        return list(self.collection_names)
+
+    def create_collection(self, name, check_exists=True):
+        self.collection_names.append(name)
+
+    def __getitem__(self, name):
+        database = self
+
+        class Collection:
+            def create_indexes(self, indexes):
+                database.indexed.append(name)
+                names = [index.document["name"] for index in indexes]
+                for index_name in names:
+                    if index_name in database.duplicates.get(name, ()):
+                        raise OperationFailure(
+                            f"E11000 duplicate key error index: {index_name}",
+                            code=DUPLICATE_KEY,
+                        )
+                database.built.update((name, index_name) for index_name in names)
+
+            def insert_one(self, document):
+                database.inserted.append(name)
+                return SimpleNamespace(inserted_id=len(database.inserted))
+
+            def insert_many(self, documents, ordered=True):
+                taken = database.user_names.setdefault(name, set())
+                write_errors = []
+                for position, document in enumerate(documents):
+                    if document["user_name"] in taken:
+                        write_errors.append(
+                            {
+                                "index": position,
+                                "code": DUPLICATE_KEY,
+                                "keyPattern": {"user_name": 1},
+                                "errmsg": "E11000 duplicate key error",
+                            }
+                        )
+                    taken.add(document["user_name"])
+                if write_errors:
+                    raise BulkWriteError({"writeErrors": write_errors})
+
+        return Collection()
+
+
+class AsyncRecordingDatabase(RecordingDatabase):
+    """motor flavour of RecordingDatabase, with the same calls awaited."""
+
+    async def list_collection_names(self):
+        return super().list_collection_names()
+
+    async def create_collection(self, name, check_exists=True):
+        super().create_collection(name, check_exists)
+
+    def __getitem__(self, name):
+        collection = super().__getitem__(name)
+
+        class Collection:
+            async def create_indexes(self, indexes):
+                collection.create_indexes(indexes)
+
+            async def insert_many(self, documents, ordered=True):
+                collection.insert_many(documents, ordered)
+
+        return Collection()
+
+
+def make_handler(
+    collection_names, ttl=None, duplicates=None, handler_class=MongoHandler
+):
+    # the client connects lazily, so no server is needed until a query
+    handler = handler_class(
+        "mongodb://localhost:27017/", "auth-api", collection_registry_ttl=ttl
+    )
+    database_class = (
+        AsyncRecordingDatabase
+        if handler_class is AsyncMongoHandler
+        else RecordingDatabase
+    )
+    handler.db = handler.insert_db = database_class(collection_names, duplicates)
+    return handler
+
+
+def test_expired_registry_reloads_names_without_index_builds():
+    """Test a registry refresh during a signup does not re-index every collection."""
+    handler = make_handler(["app-a", "app-b"], ttl=0)
+    handler.warm_collections()
+    assert handler.db.indexed == ["app-a", "app-b"]
+
+    handler.create_collection_if_not_exist("app-a")
+    handler.create_collection_if_not_exist("app-new")
+
+    assert handler.db.indexed == ["app-a", "app-b", "app-new"]
+    handler.close()
+
+
+def test_duplicates_skip_their_index_without_failing_startup(caplog):
+    """Test a collection holding duplicates keeps its other indexes, not signups."""
+    handler = make_handler(
+        ["app-a", "app-b"], duplicates={"app-a": {"user_name_unique"}}
+    )
+
+    handler.warm_collections()
+
+    assert ("app-a", "user_name_unique") not in handler.db.built
+    assert ("app-a", "user_id_unique") in handler.db.built
+    assert ("app-a", "refresh_token_ttl") in handler.db.built
+    assert ("app-b", "user_name_unique") in handler.db.built
+    assert "Skipped index 'user_name_unique' on 'app-a' collection" in caplog.text
+    # no signups into app-a, its inserts would take more duplicates
+    with pytest.raises(MissingUniqueIndexError):
+        handler.create_collection_if_not_exist("app-a")
+    handler.create_collection_if_not_exist("app-b")
+    handler.close()
+
+
+def test_refresh_tokens_skip_the_signup_write_concern():
+    """Test refresh tokens are written through the default database, not insert_db."""
+    handler = make_handler(["app-a"])
+    handler.insert_db = RecordingDatabase(["app-a"])
+
+    handler.create_token("app-a", {"refresh_token": "digest"})
+    handler.create("app-a", {"user_name": "ana"})
+
+    assert handler.db.inserted == ["app-a"]
+    assert handler.insert_db.inserted == ["app-a"]
+    handler.close()
+
+
+def test_duplicated_key_reads_key_pattern():
+    """Test the field comes from keyPattern when the server reports it."""
+    details = {
+        "keyPattern": {"user_id": 1},
+        "errmsg": "E11000 duplicate key error index: user_name_unique",
+    }
+
+    assert duplicated_key(details) == "user_id"
+
+
+def test_duplicated_key_falls_back_to_index_name():
+    """Test older servers are matched by the index name in the message."""
+    details = {
+        "errmsg": "E11000 duplicate key error collection: auth-api.app-a "
+        "index: user_id_unique dup key: { user_id: 7 }"
+    }
+
+    assert duplicated_key(details) == "user_id"
+    assert duplicated_key({"errmsg": "E11000 duplicate key error"}) == ""
+
+
+def test_async_warm_up_indexes_every_collection():
+    """Test the async handler ensures the indexes of existing collections."""
+
+    async def scenario():
+        handler = make_handler(["app-a", "app-b"], handler_class=AsyncMongoHandler)
+        await handler.warm_collections()
+        handler.close()
+        return handler
+
+    handler = asyncio.run(scenario())
+
+    assert handler.db.indexed == ["app-a", "app-b"]
+    assert ("app-b", "refresh_token_ttl") in handler.db.built
+    assert "app-a" in handler.collections
+
+
+def test_async_expired_registry_reloads_names_without_index_builds():
+    """Test the async registry refresh only indexes the collection it creates."""
+
+    async def scenario():
+        handler = make_handler(
+            ["app-a", "app-b"], ttl=0, handler_class=AsyncMongoHandler
+        )
+        await handler.warm_collections()
+        await handler.create_collection_if_not_exist("app-a")
+        await handler.create_collection_if_not_exist("app-new")
+        handler.close()
+        return handler
+
+    handler = asyncio.run(scenario())
+
+    assert handler.db.indexed == ["app-a", "app-b", "app-new"]
+
+
+def test_async_duplicates_skip_their_index_without_failing_startup(caplog):
+    """Test the async handler skips the blocked index and refuses signups too."""
+
+    async def scenario():
+        handler = make_handler(
+            ["app-a", "app-b"],
+            duplicates={"app-a": {"user_name_unique"}},
+            handler_class=AsyncMongoHandler,
+        )
+        await handler.warm_collections()
+        with pytest.raises(MissingUniqueIndexError):
+            await handler.create_collection_if_not_exist("app-a")
+        await handler.create_collection_if_not_exist("app-b")
+        handler.close()
+        return handler
+
+    handler = asyncio.run(scenario())
+
+    assert ("app-a", "user_name_unique") not in handler.db.built
+    assert ("app-a", "user_id_unique") in handler.db.built
+    assert ("app-b", "user_name_unique") in handler.db.built
+    assert "Skipped index 'user_name_unique' on 'app-a' collection" in caplog.text
+
+
+def test_async_create_many_returns_rejected_documents():
+    """Test write errors of an unordered insert point at the rejected documents."""
+
+    def users(*names):
+        return [{"user_name": name} for name in names]
+
+    async def scenario():
+        handler = make_handler([], handler_class=AsyncMongoHandler)
+        accepted = await handler.create_many("app-a", users("ana"))
+        write_errors = await handler.create_many(
+            "app-a", users("bob", "ana", "cid", "cid")
+        )
+        handler.close()
+        return accepted, write_errors
+
+    accepted, write_errors = asyncio.run(scenario())
+
+    # bob and the first cid are inserted, ana exists and cid is repeated
+    assert accepted == []
+    assert [error["index"] for error in write_errors] == [1, 3]
+    assert {duplicated_key(error) for error in write_errors} == {"user_name"}
@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+
+from auth_api.databases.pool_stats import PoolStatsListener
+
+
+def test_pool_stats_track_waiters_check_outs_and_wait_time():
+    """Test pool events add up to in use, queued and waited counters."""
+    listener = PoolStatsListener()
+    address = ("localhost", 27017)
+
+    listener.connection_created(SimpleNamespace(address=address))
+    for _ in range(3):
+        listener.connection_check_out_started(SimpleNamespace(address=address))
+    listener.connection_checked_out(SimpleNamespace(address=address, duration=0.002))
+    listener.connection_check_out_failed(
+        SimpleNamespace(address=address, duration=0.5, reason="timeout")
+    )
+    in_use = listener.stats()
+    listener.connection_checked_in(SimpleNamespace(address=address))
+
+    assert in_use["checked_out"] == 1
+    assert in_use["waiters"] == 1
+    assert in_use["checkout_failures"] == 1
+    assert in_use["wait_seconds_total"] == 0.502
+    assert in_use["wait_seconds_max"] == 0.5
+    assert listener.stats()["checked_out"] == 0
+    assert listener.stats()["open"] == 1
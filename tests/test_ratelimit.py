@@ -0,0 +1,37 @@
+from auth_api.utils.ratelimit import TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bucket_rejects_past_burst_and_refills():
+    """Test a key gets `burst` requests at once, then `rate` per second."""
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=2, burst=3, clock=clock)
+
+    assert [limiter.acquire("10.0.0.1")[0] for _ in range(4)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert limiter.acquire("10.0.0.1")[1] == 0.5
+    clock.now = 0.5
+    assert limiter.acquire("10.0.0.1") == (True, 0.0)
+    assert limiter.acquire("10.0.0.2")[0]
+
+
+def test_limiter_memory_is_bounded():
+    """Test the least recently used bucket is dropped past max_keys."""
+    limiter = TokenBucketLimiter(rate=1, burst=1, max_keys=2)
+
+    for key in ("a", "b", "c"):
+        limiter.acquire(key)
+
+    assert limiter.stats()["keys"] == 2
+    assert limiter.stats()["evictions"] == 1
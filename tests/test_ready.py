@@ -0,0 +1,73 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from auth_api.app import api
+from auth_api.databases.registry import CollectionRegistry
+
+CONFIGS = {
+    "APP_NAME": "auth-api-test",
+    "TIME_ZONE": "UTC",
+    "AUTH_CONFIG": {
+        "secret_key": "secret",
+        "expire_delta": 60,
+        "algorithm": "HS256",
+        "encrypt_key": "key",
+    },
+    "APP_LOGGING": {"request_summary": False},
+}
+
+
+class Pinged:
+    """Stands in for the Mongo handler, answering pings with `ping`."""
+
+    collections = CollectionRegistry()
+
+    def __init__(self, ping):
+        self.ping = ping
+
+    def warm_collections(self):
+        pass
+
+
+def probe(ping) -> tuple:
+    with TestClient(api.create_app(CONFIGS, Pinged(ping))) as client:
+        response = client.get("/ready")
+    return response.status_code, response.json()
+
+
+def test_ready_when_mongo_answers():
+    """Test the probe passes while pings succeed."""
+
+    async def ping():
+        pass
+
+    status_code, body = probe(ping)
+
+    assert status_code == 200
+    assert body["status"] == "READY"
+
+
+def test_not_ready_when_ping_fails():
+    """Test an unreachable server fails the probe with a 503."""
+
+    def ping():
+        raise ConnectionError("connection refused")
+
+    status_code, body = probe(ping)
+
+    assert status_code == 503
+    assert body["status"] == "NOT_READY"
+
+
+def test_not_ready_when_ping_times_out(monkeypatch):
+    """Test a ping slower than the probe budget fails it instead of hanging."""
+    monkeypatch.setattr(api, "READY_PING_TIMEOUT", 0.05)
+
+    async def ping():
+        await asyncio.sleep(1)
+
+    status_code, body = probe(ping)
+
+    assert status_code == 503
+    assert body["status"] == "NOT_READY"
@@ -0,0 +1,27 @@
+from auth_api.databases.records import UserRecord
+
+
+def test_user_record_from_projected_document():
+    """Test a projected user document maps onto a slotted record."""
+    document = {
+        "user_id": 1,
+        "user_name": "usertest1",
+        "password": "hash",
+        "token": "token",
+        "role": "user",
+    }
+    assert set(document) == {
+        field for field, keep in UserRecord.PROJECTION.items() if keep
+    }
+
+    record = UserRecord.from_document(document)
+
+    assert (record.user_id, record.password, record.token, record.role) == (
+        1,
+        "hash",
+        "token",
+        "user",
+    )
+    assert not hasattr(record, "__dict__")
+    assert "hash" not in repr(record)
+    assert UserRecord.from_document(None) is None
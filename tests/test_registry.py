@@ -0,0 +1,22 @@
+from auth_api.databases.registry import CollectionRegistry
+
+
+def test_registry_counts_hits_and_misses():
+    """Test lookups are counted and added collections become hits."""
+    registry = CollectionRegistry()
+    registry.load(["app-a"])
+
+    assert registry.lookup("app-a")
+    assert not registry.lookup("app-b")
+    registry.add("app-b")
+    assert registry.lookup("app-b")
+    assert registry.stats() == {"hits": 2, "misses": 1, "size": 2}
+
+
+def test_registry_expires_after_ttl():
+    """Test a stale registry forgets its content and asks for a reload."""
+    registry = CollectionRegistry(ttl=0)
+    registry.load(["app-a"])
+
+    assert not registry.lookup("app-a")
+    assert not registry.loaded
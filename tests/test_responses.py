@@ -0,0 +1,32 @@
+import json
+
+import pytest
+from fastapi.exceptions import RequestValidationError
+
+from auth_api.app.api import decode_login
+from auth_api.app.responses import FixedResponse, JSONResponse
+
+
+def test_fixed_response_matches_rendered_response():
+    """Test a precomputed response carries the same bytes and headers."""
+    content = {"status": "AUTH_FAILED", "message": "Token has expired ü"}
+    fixed = FixedResponse(content, 403, {"WWW-Authenticate": "Bearer"})
+    rendered = JSONResponse(content, 403, {"WWW-Authenticate": "Bearer"})
+
+    first, second = fixed(), fixed()
+    first.headers["X-Extra"] = "1"
+
+    assert json.loads(second.body) == content
+    assert (second.body, second.status_code) == (rendered.body, 403)
+    assert second.raw_headers == rendered.raw_headers
+
+
+def test_decode_login_fast_path_and_fallback():
+    """Test valid bodies skip the model and invalid ones still raise a 422."""
+    body = b'{"app_name": "app-test", "user_name": "usertest1", "password": "test123"}'
+    assert decode_login(body) == ("app-test", "usertest1", "test123")
+
+    with pytest.raises(RequestValidationError) as error:
+        decode_login(b'{"app_name": "app-test", "user_name": 1}')
+    locations = {tuple(detail["loc"]) for detail in error.value.errors()}
+    assert locations == {("body", "user_name"), ("body", "password")}
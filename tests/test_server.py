@@ -0,0 +1,12 @@
+from auth_api.app.models import ServerConfig
+from auth_api.app.server import uvicorn_options
+
+
+def test_trusted_proxies_are_passed_to_uvicorn():
+    """Test client addresses are taken from X-Forwarded-For of the gateway only."""
+    options = uvicorn_options(
+        ServerConfig(HOST="127.0.0.1", FORWARDED_ALLOW_IPS="10.0.0.0/8")
+    )
+
+    assert options["proxy_headers"] is True
+    assert options["forwarded_allow_ips"] == "10.0.0.0/8"
@@ -0,0 +1,34 @@
+import asyncio
+
+from auth_api.utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    """Test duplicates in flight wait for the first call instead of running."""
+    flights = SingleFlight()
+    calls = []
+
+    async def check():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "VALID_TOKEN"
+
+    async def scenario():
+        key = flights.fingerprint("app-test", "usertest1", "test123")
+        return await asyncio.gather(*(flights.do(key, check) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert results == ["VALID_TOKEN"] * 5
+    assert len(calls) == 1
+    assert flights.stats() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_fingerprint_hides_and_separates_credentials():
+    """Test fingerprints hold no plaintext and do not collide on field splits."""
+    flights = SingleFlight()
+
+    fingerprint = flights.fingerprint("app", "user", "secret")
+
+    assert b"secret" not in fingerprint
+    assert fingerprint != flights.fingerprint("app", "users", "ecret")
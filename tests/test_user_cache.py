@@ -0,0 +1,43 @@
+import asyncio
+
+from auth_api.databases.user_cache import UserRecordCache
+
+
+def test_user_cache_reads_through_until_invalidated():
+    """Test records are loaded once, then reloaded after an invalidation."""
+    cache = UserRecordCache(max_size=10, ttl=60)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return {"user_name": "usertest1", "password": f"hash-{len(loads)}"}
+
+    async def scenario():
+        first = await cache.get("app-test", "usertest1", load)
+        cached = await cache.get("app-test", "usertest1", load)
+        cache.invalidate("app-test", "usertest1")
+        reloaded = await cache.get("app-test", "usertest1", load)
+        return first, cached, reloaded
+
+    first, cached, reloaded = asyncio.run(scenario())
+
+    assert cached is first
+    assert reloaded["password"] == "hash-2"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["hit_ratio"] == round(1 / 3, 4)
+
+
+def test_lookup_racing_an_invalidation_is_not_cached():
+    """Test a record read before a concurrent write is not stored."""
+    cache = UserRecordCache(max_size=10, ttl=60)
+
+    async def stale_load():
+        cache.invalidate("app-test", "usertest1")
+        return {"user_name": "usertest1", "password": "old-hash"}
+
+    async def scenario():
+        await cache.get("app-test", "usertest1", stale_load)
+
+    asyncio.run(scenario())
+
+    assert cache.stats()["size"] == 0